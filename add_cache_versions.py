@@ -0,0 +1,66 @@
+"""
+Add the cache_versions table behind the in-process dashboard cache
+
+Each gunicorn worker keeps its own cache, so clearing it on a write only
+reaches the worker that handled that request. Instead, one row per table
+counts the writes to it; triggers bump the count inside the writing
+transaction, and the app puts the counts in its cache keys, so every worker
+stops using entries from before the write on its next request.
+"""
+
+import sqlite3
+
+# Tables whose writes invalidate cached pages (dashboard counts, letter lists,
+# dropdowns) -> columns whose UPDATE counts, None for any column. Logins
+# update users.last_login, which no cached page shows.
+VERSIONED_TABLES = {
+    'notesheets': None,
+    'bills': None,
+    'letters': None,
+    'users': ['username', 'full_name', 'designation', 'section_id', 'is_active', 'is_superuser'],
+    'sections': None,
+}
+
+conn = sqlite3.connect('wbsedcl_tracking.db')
+cursor = conn.cursor()
+
+try:
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    tables = {row[0] for row in cursor.fetchall()}
+    
+    print("Creating cache_versions table...")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cache_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    
+    for table, columns in VERSIONED_TABLES.items():
+        if table not in tables:
+            print(f"   - {table} skipped (table not found)")
+            continue
+        
+        cursor.execute('INSERT OR IGNORE INTO cache_versions (name) VALUES (?)', (table,))
+        update = f"UPDATE OF {', '.join(columns)}" if columns else 'UPDATE'
+        for suffix, event in (('ai', 'INSERT'), ('au', update), ('ad', 'DELETE')):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_version_{suffix} AFTER {event} ON {table} BEGIN
+                    UPDATE cache_versions SET version = version + 1 WHERE name = '{table}';
+                END
+            ''')
+        print(f"   ✓ {table} triggers")
+    
+    conn.commit()
+    
+    print("\n" + "="*80)
+    print("✅ Cache versions created successfully!")
+    print("Restart the application to switch its page caches to cache_versions.")
+    print("="*80)
+    
+except Exception as e:
+    print(f"❌ Error: {e}")
+    conn.rollback()
+
+finally:
+    conn.close()
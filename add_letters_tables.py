@@ -112,6 +112,18 @@ def add_letters_tables():
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_letter_movements_current ON letter_movements(is_current)')
         print("   ✓ idx_letter_movements_current")
         
+        # One current movement per letter; on a re-run against older data,
+        # only the newest of several current movements keeps the flag
+        cursor.execute('''
+            UPDATE letter_movements SET is_current = 0
+            WHERE is_current = 1 AND movement_id < (
+                SELECT MAX(m.movement_id) FROM letter_movements m
+                WHERE m.letter_id = letter_movements.letter_id AND m.is_current = 1
+            )
+        ''')
+        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS ix_lm_one_current ON letter_movements(letter_id) WHERE is_current = 1')
+        print("   ✓ ix_lm_one_current")
+        
         conn.commit()
         conn.close()
         
@@ -0,0 +1,139 @@
+"""
+Add composite and partial indexes for the dashboard, list, "my documents" and report queries
+"""
+
+import sqlite3
+
+INDEXES = [
+    # Notesheets
+    ('ix_ns_holder_date',
+     'CREATE INDEX IF NOT EXISTS ix_ns_holder_date ON notesheets(current_holder, received_date DESC)'),
+    ('ix_ns_holder_status',
+     'CREATE INDEX IF NOT EXISTS ix_ns_holder_status ON notesheets(current_holder, current_status, is_parked)'),
+    ('ix_ns_parked',
+     'CREATE INDEX IF NOT EXISTS ix_ns_parked ON notesheets(is_parked) WHERE is_parked = 1'),
+    ('ix_ns_active',
+     'CREATE INDEX IF NOT EXISTS ix_ns_active ON notesheets(received_date) WHERE is_parked = 0 AND current_holder IS NOT NULL'),
+    ('ix_ns_priority',
+     'CREATE INDEX IF NOT EXISTS ix_ns_priority ON notesheets(priority, is_parked, current_status, received_date)'),
+    ('ix_ns_status_date',
+     'CREATE INDEX IF NOT EXISTS ix_ns_status_date ON notesheets(current_status, received_date DESC)'),
+    ('ix_ns_received',
+     'CREATE INDEX IF NOT EXISTS ix_ns_received ON notesheets(received_date DESC)'),
+    ('ix_ns_parked_cover',
+     'CREATE INDEX IF NOT EXISTS ix_ns_parked_cover ON notesheets(parked_date DESC, notesheet_id, '
+     'notesheet_number, subject, sender_name, received_date, parked_by, is_parked) WHERE is_parked = 1'),
+    ('ix_ns_subject',
+     'CREATE INDEX IF NOT EXISTS ix_ns_subject ON notesheets(subject COLLATE NOCASE)'),
+    ('ix_ns_sender',
+     'CREATE INDEX IF NOT EXISTS ix_ns_sender ON notesheets(sender_name COLLATE NOCASE)'),
+    ('ix_nsm_current',
+     'CREATE INDEX IF NOT EXISTS ix_nsm_current ON notesheet_movements(notesheet_id, is_current, forwarded_date)'),
+
+    # Bills
+    ('ix_bills_holder_date',
+     'CREATE INDEX IF NOT EXISTS ix_bills_holder_date ON bills(current_holder, received_date DESC)'),
+    ('ix_bills_holder_payment',
+     'CREATE INDEX IF NOT EXISTS ix_bills_holder_payment ON bills(current_holder, payment_status)'),
+    ('ix_bills_parked',
+     'CREATE INDEX IF NOT EXISTS ix_bills_parked ON bills(is_parked) WHERE is_parked = 1'),
+    ('ix_bills_active',
+     'CREATE INDEX IF NOT EXISTS ix_bills_active ON bills(received_date) WHERE is_parked = 0 AND current_holder IS NOT NULL'),
+    ('ix_bills_priority',
+     'CREATE INDEX IF NOT EXISTS ix_bills_priority ON bills(priority, is_parked, payment_status, received_date)'),
+    ('ix_bills_status_date',
+     'CREATE INDEX IF NOT EXISTS ix_bills_status_date ON bills(current_status, received_date DESC)'),
+    ('ix_bills_received',
+     'CREATE INDEX IF NOT EXISTS ix_bills_received ON bills(received_date DESC)'),
+    ('ix_bills_vendor',
+     'CREATE INDEX IF NOT EXISTS ix_bills_vendor ON bills(vendor_name COLLATE NOCASE)'),
+    ('ix_bills_invoice',
+     'CREATE INDEX IF NOT EXISTS ix_bills_invoice ON bills(invoice_number COLLATE NOCASE)'),
+    ('ix_bm_current',
+     'CREATE INDEX IF NOT EXISTS ix_bm_current ON bill_movements(bill_id, is_current, forwarded_date)'),
+
+    # Letters
+    ('ix_letters_holder_date',
+     'CREATE INDEX IF NOT EXISTS ix_letters_holder_date ON letters(current_holder, received_date DESC)'),
+    ('ix_letters_holder_status',
+     'CREATE INDEX IF NOT EXISTS ix_letters_holder_status ON letters(current_holder, current_status)'),
+    ('ix_letters_parked',
+     'CREATE INDEX IF NOT EXISTS ix_letters_parked ON letters(is_parked) WHERE is_parked = 1'),
+    ('ix_letters_active',
+     'CREATE INDEX IF NOT EXISTS ix_letters_active ON letters(received_date) WHERE is_parked = 0 AND current_holder IS NOT NULL'),
+    ('ix_letters_priority',
+     'CREATE INDEX IF NOT EXISTS ix_letters_priority ON letters(priority, is_parked, current_status, received_date)'),
+    ('ix_letters_status_date',
+     'CREATE INDEX IF NOT EXISTS ix_letters_status_date ON letters(current_status, received_date DESC)'),
+    ('ix_letters_received',
+     'CREATE INDEX IF NOT EXISTS ix_letters_received ON letters(received_date DESC)'),
+    ('ix_letters_parked_date',
+     'CREATE INDEX IF NOT EXISTS ix_letters_parked_date ON letters(parked_date DESC) WHERE is_parked = 1'),
+    ('ix_letters_subject',
+     'CREATE INDEX IF NOT EXISTS ix_letters_subject ON letters(subject COLLATE NOCASE)'),
+    ('ix_letters_sender',
+     'CREATE INDEX IF NOT EXISTS ix_letters_sender ON letters(sender_name COLLATE NOCASE)'),
+    ('ix_lm_current',
+     'CREATE INDEX IF NOT EXISTS ix_lm_current ON letter_movements(letter_id, is_current, forwarded_date)'),
+    ('ix_lm_one_current',
+     'CREATE UNIQUE INDEX IF NOT EXISTS ix_lm_one_current ON letter_movements(letter_id) WHERE is_current = 1'),
+
+    # Users
+    ('ix_urm_role',
+     'CREATE INDEX IF NOT EXISTS ix_urm_role ON user_role_mapping(role_id, user_id)'),
+]
+
+# Indexes an entry above replaces
+SUPERSEDED_INDEXES = [
+    'ix_ns_parked_date',    # ix_ns_parked_cover
+]
+
+conn = sqlite3.connect('wbsedcl_tracking.db')
+cursor = conn.cursor()
+
+try:
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    tables = {row[0] for row in cursor.fetchall()}
+    
+    # ix_lm_one_current allows one current movement per letter; where an
+    # earlier double forward left several, only the newest keeps the flag
+    if 'letter_movements' in tables:
+        cursor.execute('''
+            UPDATE letter_movements SET is_current = 0
+            WHERE is_current = 1 AND movement_id < (
+                SELECT MAX(m.movement_id) FROM letter_movements m
+                WHERE m.letter_id = letter_movements.letter_id AND m.is_current = 1
+            )
+        ''')
+        if cursor.rowcount:
+            print(f"Cleared {cursor.rowcount} stale current letter movement(s)")
+    
+    print("Creating performance indexes...")
+    for name, sql in INDEXES:
+        table = sql.split(' ON ')[1].split('(')[0]
+        if table not in tables:
+            print(f"   - {name} skipped ({table} table not found)")
+            continue
+        cursor.execute(sql)
+        print(f"   ✓ {name}")
+    
+    for name in SUPERSEDED_INDEXES:
+        cursor.execute(f'DROP INDEX IF EXISTS {name}')
+    
+    conn.commit()
+    
+    # Refresh planner statistics so the new indexes are picked up
+    print("\nRunning ANALYZE...")
+    cursor.execute('ANALYZE')
+    conn.commit()
+    
+    print("\n" + "="*80)
+    print("✅ Performance indexes created successfully!")
+    print("="*80)
+    
+except Exception as e:
+    print(f"❌ Error: {e}")
+    conn.rollback()
+
+finally:
+    conn.close()
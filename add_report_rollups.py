@@ -0,0 +1,111 @@
+"""
+Add the report_monthly rollup table behind the Monthly Summary report
+
+One row per (month, document type) holds the documents received that month,
+how many of them are cleared, and the sum of their received julianday values
+(so the report can still work out "average days since received" as of today).
+Triggers on notesheets, bills and letters keep the rows current.
+"""
+
+import sqlite3
+
+# table -> (doc_type, SQL condition for a cleared document)
+ROLLUP_TABLES = {
+    'notesheets': ('notesheet', "{row}.current_status = 'Closed'"),
+    'bills': ('bill', "{row}.payment_status = 'Paid'"),
+    'letters': ('letter', "{row}.current_status = 'Closed'"),
+}
+
+
+def add_row_sql(doc_type, cleared, row):
+    """Statement counting NEW/OLD row into its month"""
+    return f'''
+                INSERT INTO report_monthly (month, doc_type, received, cleared, received_julian_sum)
+                VALUES (strftime('%Y-%m', {row}.received_date), '{doc_type}', 1,
+                        CASE WHEN {cleared.format(row=row)} THEN 1 ELSE 0 END,
+                        julianday({row}.received_date))
+                ON CONFLICT(month, doc_type) DO UPDATE SET
+                    received = received + 1,
+                    cleared = cleared + excluded.cleared,
+                    received_julian_sum = received_julian_sum + excluded.received_julian_sum;'''
+
+
+def remove_row_sql(doc_type, cleared, row):
+    """Statement taking NEW/OLD row back out of its month"""
+    return f'''
+                UPDATE report_monthly SET
+                    received = received - 1,
+                    cleared = cleared - CASE WHEN {cleared.format(row=row)} THEN 1 ELSE 0 END,
+                    received_julian_sum = received_julian_sum - julianday({row}.received_date)
+                WHERE month = strftime('%Y-%m', {row}.received_date) AND doc_type = '{doc_type}';'''
+
+
+conn = sqlite3.connect('wbsedcl_tracking.db')
+cursor = conn.cursor()
+
+try:
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    tables = {row[0] for row in cursor.fetchall()}
+    
+    print("Creating report_monthly table...")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS report_monthly (
+            month TEXT NOT NULL,
+            doc_type TEXT NOT NULL,
+            received INTEGER NOT NULL DEFAULT 0,
+            cleared INTEGER NOT NULL DEFAULT 0,
+            received_julian_sum REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, doc_type)
+        )
+    ''')
+    cursor.execute('DELETE FROM report_monthly')
+    
+    for table, (doc_type, cleared) in ROLLUP_TABLES.items():
+        if table not in tables:
+            print(f"   - {table} skipped (table not found)")
+            continue
+        
+        status_column = 'payment_status' if table == 'bills' else 'current_status'
+        
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_rollup_ai AFTER INSERT ON {table} BEGIN
+                {add_row_sql(doc_type, cleared, 'NEW')}
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_rollup_ad AFTER DELETE ON {table} BEGIN
+                {remove_row_sql(doc_type, cleared, 'OLD')}
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_rollup_au AFTER UPDATE OF received_date, {status_column} ON {table} BEGIN
+                {remove_row_sql(doc_type, cleared, 'OLD')}
+                {add_row_sql(doc_type, cleared, 'NEW')}
+            END
+        ''')
+        
+        # Backfill from the rows that already exist
+        cursor.execute(f'''
+            INSERT INTO report_monthly (month, doc_type, received, cleared, received_julian_sum)
+            SELECT strftime('%Y-%m', received_date), '{doc_type}', COUNT(*),
+                   SUM(CASE WHEN {cleared.format(row=table)} THEN 1 ELSE 0 END),
+                   SUM(julianday(received_date))
+            FROM {table}
+            WHERE received_date IS NOT NULL
+            GROUP BY strftime('%Y-%m', received_date)
+        ''')
+        print(f"   ✓ {table} triggers and {cursor.rowcount} month rows")
+    
+    conn.commit()
+    
+    print("\n" + "="*80)
+    print("✅ Report rollups created successfully!")
+    print("Restart the application to switch the Monthly Summary report to report_monthly.")
+    print("="*80)
+    
+except Exception as e:
+    print(f"❌ Error: {e}")
+    conn.rollback()
+
+finally:
+    conn.close()
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+Add FTS5 full-text indexes for Advanced Search keyword queries
+
+Uses the trigram tokenizer (SQLite 3.34+) so a keyword still matches anywhere
+inside a subject/number/name, exactly like the LIKE '%keyword%' search it
+replaces. Triggers keep each index in sync with its table.
+"""
+
+import sqlite3
+
+# table -> (primary key, columns covered by the keyword search)
+SEARCH_TABLES = {
+    'notesheets': ('notesheet_id', ['subject', 'notesheet_number', 'sender_name']),
+    'bills': ('bill_id', ['vendor_name', 'bill_number', 'invoice_number']),
+    'letters': ('letter_id', ['subject', 'letter_number', 'sender_name']),
+}
+
+conn = sqlite3.connect('wbsedcl_tracking.db')
+cursor = conn.cursor()
+
+try:
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    tables = {row[0] for row in cursor.fetchall()}
+    
+    for table, (pk, columns) in SEARCH_TABLES.items():
+        if table not in tables:
+            print(f"   - {table}_fts skipped ({table} table not found)")
+            continue
+        
+        fts = f'{table}_fts'
+        cols = ', '.join(columns)
+        new_cols = ', '.join(f'new.{c}' for c in columns)
+        old_cols = ', '.join(f'old.{c}' for c in columns)
+        
+        print(f"Creating {fts}...")
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {cols},
+                content='{table}',
+                content_rowid='{pk}',
+                tokenize='trigram'
+            )
+        ''')
+        
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts}(rowid, {cols}) VALUES (new.{pk}, {new_cols});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{pk}, {old_cols});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{pk}, {old_cols});
+                INSERT INTO {fts}(rowid, {cols}) VALUES (new.{pk}, {new_cols});
+            END
+        ''')
+        
+        # Index the rows that already exist
+        cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        print(f"   ✓ {fts} ({cols})")
+    
+    conn.commit()
+    
+    print("\n" + "="*80)
+    print("✅ Search indexes created successfully!")
+    print("Restart the application to switch Advanced Search to the new indexes.")
+    print("="*80)
+    
+except Exception as e:
+    print(f"❌ Error: {e}")
+    conn.rollback()
+
+finally:
+    conn.close()
\ No newline at end of file
@@ -0,0 +1,18 @@
+"""
+Refresh SQLite query planner statistics (ANALYZE)
+
+Run nightly from cron / Task Scheduler and after bulk imports, e.g.
+    0 2 * * * cd /path/to/receive_section && python analyze_database.py
+"""
+
+from init_database import WBSEDCLDatabase
+
+db = WBSEDCLDatabase()
+
+try:
+    print("Running ANALYZE on wbsedcl_tracking.db...")
+    db.analyze()
+    print("✅ Planner statistics updated")
+    
+except Exception as e:
+    print(f"❌ Error: {e}")
\ No newline at end of file
@@ -9,17 +9,43 @@ VERSION: 2026-01-11-FIXED-FORWARDING-v4
 Last Updated: 2026-01-11
 """
 
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, Response, g
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
-from functools import wraps
-from datetime import datetime, timedelta
-from init_database import WBSEDCLDatabase
+from functools import wraps, lru_cache
+from datetime import date, datetime, timedelta
+from init_database import WBSEDCLDatabase, release_connections
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import escape
+import logging
 import os
+import re
+import threading
+import time
+
+# Set FLASK_DEV=1 for debug mode and template auto-reload while developing
+DEV_MODE = os.environ.get('FLASK_DEV') == '1'
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'wbsedcl-secret-key-change-in-production')
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)
+app.config['TEMPLATES_AUTO_RELOAD'] = DEV_MODE
+
+# Production: keep compiled templates on disk and skip the per-render stat check
+if not DEV_MODE:
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(pattern='wbsedcl-%s.cache')
+    app.jinja_env.auto_reload = False
+
+@app.teardown_request
+def release_db_connection(exc):
+    """Leave the thread's pooled connection clean if a route bailed out mid-transaction"""
+    release_connections()
+
+def get_db():
+    """Return this request's database connection (the thread's pooled one)"""
+    if '_db_conn' not in g:
+        g._db_conn = WBSEDCLDatabase().connect()
+    return g._db_conn
 
 # Initialize Flask-Login
 login_manager = LoginManager()
@@ -29,7 +55,8 @@ login_manager.login_message = 'Please log in to access this page.'
 
 # User class for Flask-Login
 class User(UserMixin):
-    def __init__(self, user_id, username, full_name, email, section_id, is_active, is_superuser):
+    def __init__(self, user_id, username, full_name, email, section_id, is_active, is_superuser,
+                 is_section_head=None):
         self.id = user_id
         self.username = username
         self.full_name = full_name
@@ -38,6 +65,8 @@ class User(UserMixin):
         self._is_active = bool(is_active)
         self.is_superuser = bool(is_superuser)
         self._permissions = None
+        # load_user reads the section_head role with the user row; None = look it up
+        self._is_section_head = None if is_section_head is None else bool(is_section_head)
 
     @property
     def is_active(self):
@@ -46,9 +75,12 @@ class User(UserMixin):
     def get_permissions(self):
         """Get user permissions from database"""
         if self._permissions is None:
-            db = WBSEDCLDatabase()
-            self._permissions = db.get_user_permissions(self.id)
-            db.close()
+            # Same query as db.get_user_permissions(), on the request's connection
+            # so it cannot roll back a route's open transaction
+            cursor = get_db().cursor()
+            cursor.execute('SELECT * FROM vw_user_permissions WHERE user_id = ?', (self.id,))
+            row = cursor.fetchone()
+            self._permissions = dict(row) if row else {}
         return self._permissions
     
     def can_receive(self):
@@ -76,34 +108,36 @@ class User(UserMixin):
         if self.is_superuser:
             return True
         
-        # Query database directly to check if user has section_head role
-        db = WBSEDCLDatabase()
-        conn = db.connect()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT COUNT(*) FROM user_role_mapping urm
-            JOIN user_roles ur ON urm.role_id = ur.role_id
-            WHERE urm.user_id = ? AND ur.role_name = 'section_head'
-        ''', (self.id,))
-        
-        has_role = cursor.fetchone()[0] > 0
-        db.close()
+        if self._is_section_head is None:
+            # Query database directly to check if user has section_head role.
+            # No db.close() here: that would roll back a route's open transaction
+            cursor = get_db().cursor()
+            cursor.execute('''
+                SELECT COUNT(*) FROM user_role_mapping urm
+                JOIN user_roles ur ON urm.role_id = ur.role_id
+                WHERE urm.user_id = ? AND ur.role_name = 'section_head'
+            ''', (self.id,))
+            
+            self._is_section_head = cursor.fetchone()[0] > 0
         
-        return has_role
+        return self._is_section_head
 
 @login_manager.user_loader
 def load_user(user_id):
     """Load user by ID for Flask-Login"""
-    db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
+    # The section_head role comes along with the user row, so role checks during
+    # the request never go back to the database
     cursor.execute('''
-        SELECT user_id, username, full_name, email, section_id, is_active, is_superuser
+        SELECT user_id, username, full_name, email, section_id, is_active, is_superuser,
+            EXISTS (
+                SELECT 1 FROM user_role_mapping urm
+                JOIN user_roles ur ON urm.role_id = ur.role_id
+                WHERE urm.user_id = users.user_id AND ur.role_name = 'section_head'
+            ) as is_section_head
         FROM users WHERE user_id = ?
     ''', (user_id,))
     user_data = cursor.fetchone()
-    db.close()
     
     if user_data and user_data[5]:  # Check is_active
         return User(*user_data)
@@ -140,6 +174,432 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def see_other(location):
+    """Bodyless 303 redirect for POST handlers (Post/Redirect/Get)"""
+    return Response(status=303, headers={'Location': location})
+
+class TTLCache:
+    """Small thread-safe in-process cache whose entries expire after ttl seconds"""
+    
+    def __init__(self, ttl, maxsize=4096):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+    
+    def set(self, key, value):
+        with self._lock:
+            if len(self._data) >= self.maxsize:
+                self._data.clear()
+            self._data[key] = (time.monotonic() + self.ttl, value)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+# Per-user dashboard counts. Keys carry the cache_versions write counts of
+# the counted tables, so a write seen by any worker invalidates them in all
+# workers; without add_cache_versions.py the counts are not cached
+dashboard_stats_cache = TTLCache(ttl=60)
+DASHBOARD_TABLES = ('notesheets', 'bills', 'letters')
+
+def data_versions():
+    """name -> write count from cache_versions, read once per request, or None
+    when add_cache_versions.py has not been run"""
+    if 'cache_versions' not in optional_tables():
+        return None
+    if '_data_versions' not in g:
+        cursor = get_db().cursor()
+        cursor.execute('SELECT name, version FROM cache_versions')
+        g._data_versions = {row['name']: row['version'] for row in cursor.fetchall()}
+    return g._data_versions
+
+def versioned_key(tables, *key):
+    """Cache key that changes with every write to tables, or None (do not cache)"""
+    versions = data_versions()
+    if versions is None:
+        return None
+    return tuple(versions.get(table) for table in tables) + key
+
+# Letter list pages (all / my / parked) by filters, versioned like the
+# dashboard counts so a letter write shows up in every worker at once
+letter_list_cache = TTLCache(ttl=60)
+LETTER_LIST_TABLES = ('letters',)
+
+def cached_letter_rows(key, query, params=()):
+    """Rows of a letter list query as dicts, served from letter_list_cache while fresh"""
+    key = versioned_key(LETTER_LIST_TABLES, *key)
+    rows = letter_list_cache.get(key) if key else None
+    if rows is None:
+        cursor = get_db().cursor()
+        cursor.execute(query, params)
+        rows = [dict(row) for row in cursor.fetchall()]
+        if key:
+            letter_list_cache.set(key, rows)
+    return rows
+
+# Shared dropdown data
+
+# Sections and user lists change rarely, so they are kept for five minutes.
+# Keys carry the users/sections write counts, so an admin's edit shows up in
+# every worker on its next request; without add_cache_versions.py nothing
+# here is cached.
+dropdown_cache = TTLCache(ttl=300)
+DROPDOWN_TABLES = ('users', 'sections')
+
+def cached_dropdown(name, load):
+    """load()'s result, shared through dropdown_cache until users or sections change"""
+    key = versioned_key(DROPDOWN_TABLES, name)
+    value = dropdown_cache.get(key) if key else None
+    if value is None:
+        value = load()
+        if key:
+            dropdown_cache.set(key, value)
+    return value
+
+def get_sections():
+    """Get all sections for form dropdowns (cached)"""
+    def load():
+        # Same rows as db.get_all_sections(), on the request's connection
+        cursor = get_db().cursor()
+        cursor.execute('SELECT * FROM sections ORDER BY section_name')
+        return [dict(row) for row in cursor.fetchall()]
+    return cached_dropdown('sections', load)
+
+def get_active_users():
+    """Get active users for filter dropdowns (cached)"""
+    def load():
+        cursor = get_db().cursor()
+        cursor.execute('SELECT user_id, username, full_name FROM users WHERE is_active = 1 ORDER BY full_name')
+        return [dict(row) for row in cursor.fetchall()]
+    return cached_dropdown('active_users', load)
+
+def get_forward_targets():
+    """Get every active non-superuser with their section, the receive section's
+    forwarding dropdown before the current holder is left out (cached)"""
+    def load():
+        cursor = get_db().cursor()
+        cursor.execute('''
+            SELECT u.user_id, u.full_name, u.designation, s.section_name, u.section_id
+            FROM users u
+            LEFT JOIN sections s ON u.section_id = s.section_id
+            WHERE u.is_active = 1 
+            AND u.is_superuser = 0
+            ORDER BY s.section_name, u.full_name
+        ''')
+        return [dict(row) for row in cursor.fetchall()]
+    return cached_dropdown('forward_targets', load)
+
+def get_user_names():
+    """Get a user_id -> full_name map covering every user, for labelling rows (cached)"""
+    def load():
+        cursor = get_db().cursor()
+        cursor.execute('SELECT user_id, full_name FROM users')
+        return {row['user_id']: row['full_name'] for row in cursor.fetchall()}
+    return cached_dropdown('user_names', load)
+
+def get_section_names():
+    """Get a section_id -> section_name map, for labelling rows (cached)"""
+    def load():
+        return {section['section_id']: section['section_name'] for section in get_sections()}
+    return cached_dropdown('section_names', load)
+
+# Tables added by the optional migration scripts: the FTS5 keyword indexes
+# (add_search_index.py), the report rollups (add_report_rollups.py) and the
+# page cache write counts (add_cache_versions.py)
+OPTIONAL_TABLES = ('notesheets_fts', 'bills_fts', 'letters_fts', 'report_monthly', 'cache_versions')
+
+@lru_cache(maxsize=1)
+def optional_tables():
+    """Optional migration tables present in the database (checked once per process)"""
+    # No db.close() here: that would roll back a route's open transaction
+    cursor = get_db().cursor()
+    placeholders = ', '.join('?' * len(OPTIONAL_TABLES))
+    cursor.execute(f"SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ({placeholders})",
+                   OPTIONAL_TABLES)
+    return frozenset(row['name'] for row in cursor.fetchall())
+
+# Advanced Search and the aging report page through long result lists by
+# seeking past the last row shown (received date, type, id) - no OFFSET/COUNT
+SEARCH_PAGE_SIZE = 100
+AGING_PAGE_SIZE = 50
+
+def page_cursor():
+    """Seek position from ?after_date=&after_type=&after_id=, or None on the first page"""
+    after_date = request.args.get('after_date', '')
+    after_type = request.args.get('after_type', '')
+    after_id = request.args.get('after_id', type=int)
+    if not (after_date and after_type and after_id):
+        return None
+    return (after_date, after_type, after_id)
+
+def next_page_url(endpoint, last_row):
+    """Same page with the current filters, continuing after last_row"""
+    args = request.args.to_dict()
+    args.update(after_date=last_row['in_date'], after_type=last_row['doc_type'],
+                after_id=last_row['doc_id'])
+    return url_for(endpoint, **args)
+
+# The document lists and the parked view page the same way on (date, id)
+LIST_PAGE_SIZE = 50
+
+def list_page_cursor():
+    """Seek position from ?after_date=&after_id= on a list page, or None on the first page"""
+    after_date = request.args.get('after_date', '')
+    after_id = request.args.get('after_id', type=int)
+    if not (after_date and after_id):
+        return None
+    return (after_date, after_id)
+
+def list_page_urls(endpoint, rows, has_more, date_key, id_key):
+    """(next page, first page) links for a list page; None where there is no such page"""
+    args = {k: v for k, v in request.args.items() if k not in ('after_date', 'after_id')}
+    next_url = None
+    if has_more:
+        next_url = url_for(endpoint, **args, after_date=rows[-1][date_key], after_id=rows[-1][id_key])
+    first_url = url_for(endpoint, **args) if list_page_cursor() else None
+    return next_url, first_url
+
+# Aging report buckets as (name, received within the last N days, received N
+# or more days ago); "held d days" counts whole days since received_date
+AGING_BUCKETS = (
+    ('fresh', 4, None),       # 0-3 days
+    ('moderate', 8, 4),       # 4-7 days
+    ('old', 15, 8),           # 8-14 days
+    ('critical', None, 15),   # 15+ days
+)
+
+def aging_cutoff(now, days):
+    """received_date boundary for "held at least this many days", as a sortable string"""
+    return (now - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S.%f')
+
+def fetch_page(cursor, size):
+    """Read one page of rows as dicts, plus whether the query has rows after it.
+    
+    Rows are pulled with fetchmany, so only the page itself is materialised.
+    """
+    rows = [dict(row) for row in cursor.fetchmany(size)]
+    return rows, cursor.fetchone() is not None
+
+# Debug mode only: warn when a report/search query full-scans one of these
+# tables once it holds more than PLAN_CHECK_MIN_ROWS rows
+PLAN_CHECK_TABLES = ('notesheets', 'bills', 'letters')
+PLAN_CHECK_MIN_ROWS = 1000
+
+def execute_checked(cursor, query, params=()):
+    """cursor.execute(), with an EXPLAIN QUERY PLAN check for full table scans in debug mode"""
+    if app.debug:
+        # Plan steps name the alias ("SCAN n"), so map aliases back to tables
+        aliases = {table: table for table in PLAN_CHECK_TABLES}
+        for table, alias in re.findall(r'\b(notesheets|bills|letters)\s+(?:AS\s+)?(\w+)', query, re.I):
+            aliases[alias] = table
+        
+        plan = cursor.execute('EXPLAIN QUERY PLAN ' + query, params).fetchall()
+        for step in plan:
+            detail = step['detail']
+            match = re.match(r'SCAN (\w+)', detail)
+            if not match or match.group(1) not in aliases:
+                continue
+            table = aliases[match.group(1)]
+            rows = cursor.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+            if rows > PLAN_CHECK_MIN_ROWS:
+                app.logger.warning('Full scan of %s (%d rows) in %s: %s',
+                                   table, rows, request.full_path, detail)
+    
+    return cursor.execute(query, params)
+
+def search_phrase(keywords):
+    """FTS5 phrase for a keyword search, or None when LIKE must be used instead"""
+    # The trigram index cannot match anything shorter than three characters
+    if len(keywords) < 3:
+        return None
+    return '"' + keywords.replace('"', '""') + '"'
+
+def julian_now():
+    """Current UTC time as a Julian day, like SQLite's julianday('now').
+    
+    Bound once per query so days-held columns are a plain subtraction per row.
+    """
+    return time.time() / 86400.0 + 2440587.5
+
+# How each document type maps onto the common Advanced Search columns
+SEARCH_TABLES = [
+    {
+        'doc_type': 'notesheet', 'table': 'notesheets', 'alias': 'n',
+        'id': 'notesheet_id', 'number': 'notesheet_number',
+        'subject': 'subject', 'sender': 'sender_name', 'status': 'current_status',
+        'keyword_columns': ('subject', 'notesheet_number', 'sender_name'),
+        'status_filters': {},
+    },
+    {
+        'doc_type': 'bill', 'table': 'bills', 'alias': 'b',
+        'id': 'bill_id', 'number': 'bill_number',
+        'subject': 'vendor_name', 'sender': 'vendor_name', 'status': 'payment_status',
+        'keyword_columns': ('vendor_name', 'bill_number', 'invoice_number'),
+        'status_filters': {'cleared': "payment_status = 'Paid'"},
+    },
+    {
+        'doc_type': 'letter', 'table': 'letters', 'alias': 'l',
+        'id': 'letter_id', 'number': 'letter_number',
+        'subject': 'subject', 'sender': 'sender_name', 'status': 'current_status',
+        'keyword_columns': ('subject', 'letter_number', 'sender_name'),
+        'status_filters': {'closed': "current_status = 'Closed'"},
+    },
+]
+SEARCH_TABLE_CONFIG = {cfg['table']: cfg for cfg in SEARCH_TABLES}
+
+def keyword_condition(cfg, keywords, fts_tables):
+    """AND-condition matching keywords in cfg's keyword columns, returns (sql, params).
+    
+    Goes through the table's FTS5 index when it exists, LIKE '%keywords%' otherwise.
+    """
+    a = cfg['alias']
+    fts_table = f"{cfg['table']}_fts"
+    fts_phrase = search_phrase(keywords)
+    if fts_phrase and fts_table in fts_tables:
+        return (f" AND {a}.{cfg['id']} IN (SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH ?)",
+                [fts_phrase])
+    # One UNION leg per column, so each leg scans that column's narrow index
+    # rather than one OR over every column of the table rows
+    columns = cfg['keyword_columns']
+    legs = ' UNION '.join(f"SELECT {cfg['id']} FROM {cfg['table']} WHERE {c} LIKE ?" for c in columns)
+    return (f" AND {a}.{cfg['id']} IN ({legs})",
+            [f'%{keywords}%'] * len(columns))
+
+# Document list pages: base SELECT, status column, date column and id column
+# (id None where the list is not paged). list_sql() appends the filters.
+NOTESHEETS_LIST_SQL = '''
+        SELECT 
+            n.notesheet_id, n.notesheet_number, n.subject, n.sender_name,
+            n.received_date, n.current_status, n.priority, n.is_parked,
+            u.full_name as current_holder_name,
+            s.section_name as current_section_name
+        FROM notesheets n
+        LEFT JOIN users u ON n.current_holder = u.user_id
+        LEFT JOIN sections s ON n.current_section_id = s.section_id
+        WHERE 1=1
+'''
+
+BILLS_LIST_SQL = '''
+        SELECT 
+            b.bill_id, b.bill_number, b.invoice_number, b.vendor_name,
+            b.bill_amount, b.received_date, b.current_status, b.payment_status, b.priority,
+            u.full_name as current_holder_name,
+            s.section_name as current_section_name
+        FROM bills b
+        LEFT JOIN users u ON b.current_holder = u.user_id
+        LEFT JOIN sections s ON b.current_section_id = s.section_id
+        WHERE 1=1
+'''
+
+LETTERS_LIST_SQL = '''
+        SELECT 
+            l.letter_id, l.letter_number, l.subject, l.sender_name,
+            l.received_date, l.current_status, l.priority, l.is_parked,
+            l.letter_type, l.reply_required,
+            u.full_name as current_holder_name,
+            s.section_name as current_section_name
+        FROM letters l
+        LEFT JOIN users u ON l.current_holder = u.user_id
+        LEFT JOIN sections s ON l.current_section_id = s.section_id
+        WHERE 1=1
+'''
+
+LIST_QUERIES = {
+    'notesheets': (NOTESHEETS_LIST_SQL, 'n.current_status', 'n.received_date', 'n.notesheet_id'),
+    'bills': (BILLS_LIST_SQL, 'b.current_status', 'b.received_date', 'b.bill_id'),
+    'letters': (LETTERS_LIST_SQL, 'l.current_status', 'l.received_date', 'l.letter_id'),
+}
+
+@lru_cache(maxsize=None)
+def list_sql(table, keyword_sql, by_status, after_page):
+    """Full list query for one combination of filters.
+    
+    Built once per combination, so every request with the same filters sends
+    sqlite3 the identical string and reuses its cached prepared statement.
+    Params go keyword params, status, keyset (date, date, id), then the LIMIT.
+    """
+    base, status_column, date_column, id_column = LIST_QUERIES[table]
+    query = base + keyword_sql
+    if by_status:
+        query += f' AND {status_column} = ?'
+    if id_column is None:
+        # Not paged: the whole list, newest first
+        return query + f' ORDER BY {date_column} DESC'
+    if after_page:
+        query += f' AND ({date_column} < ? OR ({date_column} = ? AND {id_column} > ?))'
+    return query + f' ORDER BY {date_column} DESC, {id_column} LIMIT ?'
+
+def build_search_sql(cfg, filters, fts_tables, now_jd):
+    """SELECT for one document type in Advanced Search, returns (sql, params)"""
+    a = cfg['alias']
+    sql = f'''
+        SELECT 
+            '{cfg['doc_type']}' as doc_type,
+            {a}.{cfg['id']} as doc_id,
+            {a}.{cfg['number']} as doc_number,
+            {a}.{cfg['subject']} as subject,
+            {a}.{cfg['sender']} as sender_name,
+            {a}.priority,
+            {a}.is_parked,
+            {a}.{cfg['status']} as status,
+            {a}.current_holder,
+            {a}.current_section_id,
+            {a}.received_date as in_date,
+            CAST(? - julianday({a}.received_date) AS INTEGER) as days_held
+        FROM {cfg['table']} {a}
+        WHERE 1=1
+    '''
+    params = [now_jd]
+    
+    status = filters['status']
+    if status == 'parked':
+        sql += f' AND {a}.is_parked = 1'
+    elif status == 'active':
+        sql += f' AND {a}.is_parked = 0'
+    elif status in cfg['status_filters']:
+        sql += f" AND {a}.{cfg['status_filters'][status]}"
+    
+    for key, column in (('priority', 'priority'), ('section_id', 'current_section_id'),
+                        ('holder_id', 'current_holder')):
+        if filters[key] != 'all':
+            sql += f' AND {a}.{column} = ?'
+            params.append(filters[key])
+    
+    if filters['date_from']:
+        sql += f' AND DATE({a}.received_date) >= ?'
+        params.append(filters['date_from'])
+    
+    if filters['date_to']:
+        sql += f' AND DATE({a}.received_date) <= ?'
+        params.append(filters['date_to'])
+    
+    if filters['keywords']:
+        condition, condition_params = keyword_condition(cfg, filters['keywords'], fts_tables)
+        sql += condition
+        params.extend(condition_params)
+    
+    if filters['doc_number']:
+        sql += f" AND {a}.{cfg['number']} LIKE ?"
+        params.append(f"%{filters['doc_number']}%")
+    
+    if filters['sender']:
+        sql += f" AND {a}.{cfg['sender']} LIKE ?"
+        params.append(f"%{filters['sender']}%")
+    
+    return sql, params
+
 # Routes
 
 @app.route('/')
@@ -349,27 +809,32 @@ def user_profile():
     
     # GET - Load user data
     cursor.execute('''
-        SELECT 
+        SELECT
             u.user_id, u.username, u.full_name, u.email, u.phone,
-            u.section_id, s.section_name, u.designation, 
-            u.is_active, u.is_superuser, u.last_login,
-            GROUP_CONCAT(ur.role_name) as roles
+            u.section_id, s.section_name, u.designation,
+            u.is_active, u.is_superuser, u.last_login
         FROM users u
         LEFT JOIN sections s ON u.section_id = s.section_id
-        LEFT JOIN user_role_mapping urm ON u.user_id = urm.user_id
-        LEFT JOIN user_roles ur ON urm.role_id = ur.role_id
         WHERE u.user_id = ?
-        GROUP BY u.user_id
     ''', (current_user.id,))
     
     user_data = cursor.fetchone()
-    columns = [desc[0] for desc in cursor.description]
-    user = dict(zip(columns, user_data))
+    user = dict(user_data)
+    
+    # Roles as a separate lookup (uses the UNIQUE(user_id, role_id) index)
+    cursor.execute('''
+        SELECT ur.role_name
+        FROM user_role_mapping urm
+        JOIN user_roles ur ON urm.role_id = ur.role_id
+        WHERE urm.user_id = ?
+    ''', (current_user.id,))
+    role_names = [row[0] for row in cursor.fetchall()]
+    user['roles'] = ','.join(role_names) if role_names else None
     
     # Get all sections (for superuser)
     sections = []
     if current_user.is_superuser:
-        sections = db.get_all_sections()
+        sections = get_sections()
     
     db.close()
     
@@ -380,99 +845,241 @@ def user_profile():
 # This includes Letters statistics
 # =============================================================================
 
-@app.route('/dashboard')
-@login_required
-def dashboard():
-    """Main dashboard"""
-    db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
-    
-    # Get statistics for CURRENT USER ONLY
-    
-    # My Notesheets - where I'm the current holder
-    cursor.execute('SELECT COUNT(*) FROM notesheets WHERE current_holder = ?', (current_user.id,))
-    my_notesheets = cursor.fetchone()[0]
-    
-    # My Pending Notesheets - where I'm the current holder and status is not Closed
-    cursor.execute("SELECT COUNT(*) FROM notesheets WHERE current_holder = ? AND current_status != 'Closed'", 
-                   (current_user.id,))
-    my_pending_notesheets = cursor.fetchone()[0]
-    
-    # My Bills - where I'm the current holder
-    cursor.execute('SELECT COUNT(*) FROM bills WHERE current_holder = ?', (current_user.id,))
-    my_bills = cursor.fetchone()[0]
-    
-    # My Pending Bills - where I'm the current holder and payment status is Pending
-    cursor.execute("SELECT COUNT(*) FROM bills WHERE current_holder = ? AND payment_status = 'Pending'", 
-                   (current_user.id,))
-    my_pending_bills = cursor.fetchone()[0]
-    
-    # My Letters - where I'm the current holder
-    cursor.execute('SELECT COUNT(*) FROM letters WHERE current_holder = ?', (current_user.id,))
-    my_letters = cursor.fetchone()[0]
-    
-    # My Pending Letters - where I'm the current holder and status is not Closed/Replied
-    cursor.execute("""
-        SELECT COUNT(*) FROM letters 
-        WHERE current_holder = ? 
-        AND current_status NOT IN ('Closed', 'Replied', 'Archived')
-    """, (current_user.id,))
-    my_pending_letters = cursor.fetchone()[0]
-    
-    # Total items with me (for "My Pending Items" card)
-    my_pending_items = my_pending_notesheets + my_pending_bills + my_pending_letters
-    
-    # Get parked documents count (Receive Section only)
-    parked_count = 0
-    if current_user.is_receive_section():
-        cursor.execute('SELECT COUNT(*) FROM notesheets WHERE is_parked = 1')
-        parked_ns = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM bills WHERE is_parked = 1')
-        parked_bills = cursor.fetchone()[0]
-        cursor.execute('SELECT COUNT(*) FROM letters WHERE is_parked = 1')
-        parked_letters = cursor.fetchone()[0]
-        parked_count = parked_ns + parked_bills + parked_letters
-    
-    # Get recent notesheets (last 5)
-    cursor.execute('''
-        SELECT notesheet_id, notesheet_number, subject, received_date, current_status
+# Fixed dashboard / "my documents" queries, kept as module constants so every
+# request reuses the same statement from sqlite3's prepared-statement cache
+
+DASHBOARD_NOTESHEET_COUNTS_SQL = '''
+    SELECT COUNT(*),
+           COALESCE(SUM(CASE WHEN current_status != 'Closed' THEN 1 ELSE 0 END), 0)
+    FROM notesheets WHERE current_holder = ?
+'''
+
+DASHBOARD_BILL_COUNTS_SQL = '''
+    SELECT COUNT(*),
+           COALESCE(SUM(CASE WHEN payment_status = 'Pending' THEN 1 ELSE 0 END), 0)
+    FROM bills WHERE current_holder = ?
+'''
+
+DASHBOARD_LETTER_COUNTS_SQL = '''
+    SELECT COUNT(*),
+           COALESCE(SUM(CASE WHEN current_status NOT IN ('Closed', 'Replied', 'Archived')
+                             THEN 1 ELSE 0 END), 0)
+    FROM letters WHERE current_holder = ?
+'''
+
+DASHBOARD_PARKED_COUNT_SQL = '''
+    SELECT (SELECT COUNT(*) FROM notesheets WHERE is_parked = 1) +
+           (SELECT COUNT(*) FROM bills WHERE is_parked = 1) +
+           (SELECT COUNT(*) FROM letters WHERE is_parked = 1)
+'''
+
+DASHBOARD_RECENT_SQL = '''
+    SELECT * FROM (
+        SELECT 'notesheet' as doc_type, notesheet_id as doc_id, notesheet_number as doc_number,
+               subject, received_date, current_status as status,
+               NULL as bill_amount, NULL as reply_required
         FROM notesheets
         WHERE current_holder = ?
         ORDER BY received_date DESC
         LIMIT 5
-    ''', (current_user.id,))
-    recent_notesheets = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    recent_notesheets = [dict(zip(columns, row)) for row in recent_notesheets]
-    
-    # Get recent bills (last 5)
-    cursor.execute('''
-        SELECT bill_id, bill_number, vendor_name, bill_amount, payment_status
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'bill', bill_id, bill_number,
+               vendor_name, received_date, payment_status,
+               bill_amount, NULL
         FROM bills
         WHERE current_holder = ?
         ORDER BY received_date DESC
         LIMIT 5
-    ''', (current_user.id,))
-    recent_bills = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    recent_bills = [dict(zip(columns, row)) for row in recent_bills]
-    
-    # Get recent letters (last 5)
-    cursor.execute('''
-        SELECT letter_id, letter_number, subject, received_date, current_status, reply_required
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'letter', letter_id, letter_number,
+               subject, received_date, current_status,
+               NULL, reply_required
         FROM letters
         WHERE current_holder = ?
         ORDER BY received_date DESC
         LIMIT 5
-    ''', (current_user.id,))
-    recent_letters = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    recent_letters = [dict(zip(columns, row)) for row in recent_letters]
+    )
+    ORDER BY received_date DESC
+'''
+
+MY_NOTESHEETS_SQL = '''
+    SELECT 
+        notesheet_id, notesheet_number, subject, sender_name,
+        received_date, current_status, priority
+    FROM notesheets
+    WHERE current_holder = ?
+    ORDER BY received_date DESC
+'''
+
+MY_BILLS_SQL = '''
+    SELECT 
+        bill_id, bill_number, invoice_number, vendor_name,
+        bill_amount, received_date, current_status, payment_status, priority
+    FROM bills
+    WHERE current_holder = ?
+    ORDER BY received_date DESC
+'''
+
+# Who a section head holding a document can forward it to: users of their own
+# section, plus every section head and receive-section user. Each UNION leg
+# is an indexed lookup (users by section, role mappings by role) instead of
+# an OR across the joined role tables.
+SECTION_HEAD_FORWARD_USERS_SQL = '''
+    SELECT u.user_id, u.full_name, u.designation, s.section_name, u.section_id
+    FROM users u
+    LEFT JOIN sections s ON u.section_id = s.section_id
+    WHERE u.section_id = :section_id
+    AND u.is_active = 1 
+    AND u.user_id != :user_id
+    AND u.is_superuser = 0
+    UNION
+    SELECT u.user_id, u.full_name, u.designation, s.section_name, u.section_id
+    FROM user_roles ur
+    JOIN user_role_mapping urm ON urm.role_id = ur.role_id
+    JOIN users u ON u.user_id = urm.user_id
+    LEFT JOIN sections s ON u.section_id = s.section_id
+    WHERE ur.role_name IN ('section_head', 'receive_section')
+    AND u.is_active = 1 
+    AND u.user_id != :user_id
+    AND u.is_superuser = 0
+    ORDER BY section_name, full_name
+'''
+
+# A sectional user's forwarding dropdown: the heads of their own section
+SECTION_MEMBER_FORWARD_USERS_SQL = '''
+    SELECT u.user_id, u.full_name, u.designation, s.section_name, u.section_id
+    FROM user_roles ur
+    JOIN user_role_mapping urm ON urm.role_id = ur.role_id
+    JOIN users u ON u.user_id = urm.user_id
+    LEFT JOIN sections s ON u.section_id = s.section_id
+    WHERE ur.role_name = 'section_head'
+    AND u.section_id = :section_id
+    AND u.is_active = 1 
+    AND u.user_id != :user_id
+    AND u.is_superuser = 0
+    ORDER BY u.full_name
+'''
+
+# Movement time-held labels for 0-365 days, built once at import
+DAYS_HELD_TEXT = ("Same day", "1 day") + tuple(f"{days} days" for days in range(2, 366))
+
+def days_held_text(days):
+    """'Same day' / '1 day' / 'N days' label for a whole number of days"""
+    if 0 <= days < len(DAYS_HELD_TEXT):
+        return DAYS_HELD_TEXT[days]
+    return f"{days} days"
+
+def label_movements(rows, includes_oldest=True):
+    """Newest-first movement rows as dicts with display_date, in_date, out_date and time_held.
+    
+    Expects forward_date_only, next_date_only (the date of the movement after it)
+    and days_held (to that next movement, or to today for the current one).
+    Each row is converted and labelled in the same pass, with user and section
+    names filled in from the cached maps. includes_oldest=False means older
+    movements were cut off, so the last row is not the first receipt.
+    """
+    user_names = get_user_names()
+    section_names = get_section_names()
+    movements = []
+    last = len(rows) - 1 if includes_oldest else len(rows)
+    for i, row in enumerate(rows):
+        movement = dict(row)
+        movement['from_user_name'] = user_names.get(movement['from_user'])
+        movement['to_user_name'] = user_names.get(movement['to_user'])
+        movement['forwarded_by_name'] = user_names.get(movement['forwarded_by'])
+        movement['from_section_name'] = section_names.get(movement['from_section_id'])
+        movement['to_section_name'] = section_names.get(movement['to_section_id'])
+        movements.append(movement)
+        in_date = movement['forward_date_only']
+        out_date = movement['next_date_only']
+        days = movement['days_held']
+        movement['display_date'] = in_date
+        
+        if i == 0:
+            # Current/newest location - still here
+            if in_date is None:
+                movement['time_held'] = "Unknown (current)"
+                continue
+            movement['in_date'] = in_date
+            movement['out_date'] = 'Present'
+            if days == 0:
+                movement['time_held'] = "Today (current)"
+            else:
+                movement['time_held'] = days_held_text(days) + " (current)"
+        elif i == last:
+            # Oldest movement (initial receipt) - OUT is the next movement
+            movement['in_date'] = in_date
+            if not in_date or not out_date:
+                movement['out_date'] = 'N/A'
+                movement['time_held'] = "Missing date"
+            else:
+                movement['out_date'] = out_date
+                if days < 0:
+                    movement['time_held'] = f"{abs(days)} days (ERROR: OUT before IN)"
+                else:
+                    movement['time_held'] = days_held_text(days)
+        else:
+            # Middle movements - time from IN to the next movement
+            if in_date is None or out_date is None:
+                movement['time_held'] = "Unknown"
+                continue
+            movement['in_date'] = in_date
+            if days < 0:
+                # Negative days - data issue, don't show OUT
+                movement['out_date'] = 'N/A'
+                movement['time_held'] = "Data error"
+            else:
+                movement['out_date'] = out_date
+                movement['time_held'] = days_held_text(days)
     
-    db.close()
+    return movements
+
+# Detail pages show this many of the latest movements unless ?all=1 is given
+MOVEMENTS_PAGE_SIZE = 50
+
+def movements_limit():
+    """LIMIT for a detail page's movement query: one past the page, or -1 (none) for ?all=1"""
+    return -1 if request.args.get('all') == '1' else MOVEMENTS_PAGE_SIZE + 1
+
+def fetch_movements(cursor):
+    """Labelled movements from a query run with LIMIT movements_limit(), plus
+    whether older movements were left out"""
+    rows = cursor.fetchall()
+    has_more = len(rows) > MOVEMENTS_PAGE_SIZE and movements_limit() != -1
+    if has_more:
+        rows = rows[:MOVEMENTS_PAGE_SIZE]
+    return label_movements(rows, includes_oldest=not has_more), has_more
+
+def get_dashboard_stats(cursor):
+    """Document counts shown on the current user's dashboard cards"""
+    # Get statistics for CURRENT USER ONLY - one conditional aggregate per table
     
-    stats = {
+    # My Notesheets / My Pending Notesheets (status is not Closed)
+    cursor.execute(DASHBOARD_NOTESHEET_COUNTS_SQL, (current_user.id,))
+    my_notesheets, my_pending_notesheets = cursor.fetchone()
+    
+    # My Bills / My Pending Bills (payment status is Pending)
+    cursor.execute(DASHBOARD_BILL_COUNTS_SQL, (current_user.id,))
+    my_bills, my_pending_bills = cursor.fetchone()
+    
+    # My Letters / My Pending Letters (status is not Closed/Replied/Archived)
+    cursor.execute(DASHBOARD_LETTER_COUNTS_SQL, (current_user.id,))
+    my_letters, my_pending_letters = cursor.fetchone()
+    
+    # Total items with me (for "My Pending Items" card)
+    my_pending_items = my_pending_notesheets + my_pending_bills + my_pending_letters
+    
+    # Get parked documents count (Receive Section only) - all three tables in one query
+    parked_count = 0
+    if current_user.is_receive_section():
+        cursor.execute(DASHBOARD_PARKED_COUNT_SQL)
+        parked_count = cursor.fetchone()[0]
+    
+    return {
         'total_notesheets': my_notesheets,
         'pending_notesheets': my_pending_notesheets,
         'total_bills': my_bills,
@@ -482,6 +1089,45 @@ def dashboard():
         'my_pending_items': my_pending_items,
         'parked_items': parked_count
     }
+
+@app.route('/dashboard')
+@login_required
+def dashboard():
+    """Main dashboard"""
+    cursor = get_db().cursor()
+    
+    # Counts are cached briefly per user, until the next document write
+    key = versioned_key(DASHBOARD_TABLES, current_user.id)
+    stats = dashboard_stats_cache.get(key) if key else None
+    if stats is None:
+        stats = get_dashboard_stats(cursor)
+        if key:
+            dashboard_stats_cache.set(key, stats)
+    
+    # Get recent notesheets, bills and letters (last 5 each) in one query
+    cursor.execute(DASHBOARD_RECENT_SQL, (current_user.id, current_user.id, current_user.id))
+    
+    # Split back into the per-type lists the template expects
+    recent_notesheets, recent_bills, recent_letters = [], [], []
+    for row in cursor.fetchall():
+        if row['doc_type'] == 'notesheet':
+            recent_notesheets.append({
+                'notesheet_id': row['doc_id'], 'notesheet_number': row['doc_number'],
+                'subject': row['subject'], 'received_date': row['received_date'],
+                'current_status': row['status']
+            })
+        elif row['doc_type'] == 'bill':
+            recent_bills.append({
+                'bill_id': row['doc_id'], 'bill_number': row['doc_number'],
+                'vendor_name': row['subject'], 'bill_amount': row['bill_amount'],
+                'payment_status': row['status']
+            })
+        else:
+            recent_letters.append({
+                'letter_id': row['doc_id'], 'letter_number': row['doc_number'],
+                'subject': row['subject'], 'received_date': row['received_date'],
+                'current_status': row['status'], 'reply_required': row['reply_required']
+            })
     
     return render_template('dashboard.html', 
                          stats=stats, 
@@ -494,31 +1140,13 @@ def dashboard():
 @login_required
 def my_notesheets():
     """Show notesheets assigned to current user"""
-    db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
     
     # Get notesheets where current user is the holder
-    cursor.execute('''
-        SELECT 
-            n.notesheet_id, n.notesheet_number, n.subject, n.sender_name,
-            n.received_date, n.current_status, n.priority, n.is_parked,
-            u.full_name as current_holder_name,
-            s.section_name as current_section_name
-        FROM notesheets n
-        LEFT JOIN users u ON n.current_holder = u.user_id
-        LEFT JOIN sections s ON n.current_section_id = s.section_id
-        WHERE n.current_holder = ?
-        ORDER BY n.received_date DESC
-    ''', (current_user.id,))
+    cursor.execute(MY_NOTESHEETS_SQL, (current_user.id,))
     
-    notesheets = cursor.fetchall()
-    
-    # Convert to list of dicts
-    columns = [desc[0] for desc in cursor.description]
-    notesheets = [dict(zip(columns, row)) for row in notesheets]
-    
-    db.close()
+    # Only the columns the list shows; the holder is always the current user
+    notesheets = [dict(row, current_holder_name=current_user.full_name) for row in cursor.fetchall()]
     
     return render_template('notesheets/list.html', notesheets=notesheets, filter_type='my')
 
@@ -526,31 +1154,13 @@ def my_notesheets():
 @login_required
 def my_bills():
     """Show bills assigned to current user"""
-    db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
     
     # Get bills where current user is the holder
-    cursor.execute('''
-        SELECT 
-            b.bill_id, b.bill_number, b.invoice_number, b.vendor_name,
-            b.bill_amount, b.received_date, b.current_status, b.payment_status, b.priority,
-            u.full_name as current_holder_name,
-            s.section_name as current_section_name
-        FROM bills b
-        LEFT JOIN users u ON b.current_holder = u.user_id
-        LEFT JOIN sections s ON b.current_section_id = s.section_id
-        WHERE b.current_holder = ?
-        ORDER BY b.received_date DESC
-    ''', (current_user.id,))
-    
-    bills = cursor.fetchall()
+    cursor.execute(MY_BILLS_SQL, (current_user.id,))
     
-    # Convert to list of dicts
-    columns = [desc[0] for desc in cursor.description]
-    bills = [dict(zip(columns, row)) for row in bills]
-    
-    db.close()
+    # Only the columns the list shows; the holder is always the current user
+    bills = [dict(row, current_holder_name=current_user.full_name) for row in cursor.fetchall()]
     
     return render_template('bills/list.html', bills=bills, filter_type='my')
 
@@ -564,9 +1174,7 @@ NO movement_id, NO is_current - just uses main tables
 @login_required
 def advanced_search():
     """Advanced search with multiple filters - INCLUDING LETTERS"""
-    db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
     
     # Get filter parameters
     doc_type = request.args.get('doc_type', 'all')
@@ -581,250 +1189,86 @@ def advanced_search():
     doc_number = request.args.get('doc_number', '')
     sender = request.args.get('sender', '')
     
-    results = []
+    filters = {
+        'doc_type': doc_type,
+        'status': status,
+        'priority': priority,
+        'section_id': section_id,
+        'holder_id': holder_id,
+        'date_from': date_from,
+        'date_to': date_to,
+        'min_days': min_days,
+        'keywords': keywords,
+        'doc_number': doc_number,
+        'sender': sender
+    }
     
-    # Only search if at least one filter is applied
-    if any([doc_type != 'all', status != 'all', priority != 'all', 
-            section_id != 'all', holder_id != 'all', date_from, date_to, 
-            min_days, keywords, doc_number, sender]):
-        
-        # Search Notesheets
-        if doc_type in ['all', 'notesheet']:
-            ns_query = '''
-                SELECT 
-                    'notesheet' as doc_type,
-                    n.notesheet_id as doc_id,
-                    n.notesheet_number as doc_number,
-                    n.subject,
-                    n.sender_name,
-                    n.priority,
-                    n.is_parked,
-                    n.current_status as status,
-                    u.full_name as holder_name,
-                    s.section_name,
-                    n.received_date as in_date,
-                    CAST(julianday('now') - julianday(n.received_date) AS INTEGER) as days_held
-                FROM notesheets n
-                LEFT JOIN users u ON n.current_holder = u.user_id
-                LEFT JOIN sections s ON n.current_section_id = s.section_id
-                WHERE 1=1
-            '''
-            params = []
-            
-            if status == 'parked':
-                ns_query += ' AND n.is_parked = 1'
-            elif status == 'active':
-                ns_query += ' AND n.is_parked = 0'
-            
-            if priority != 'all':
-                ns_query += ' AND n.priority = ?'
-                params.append(priority)
-            
-            if section_id != 'all':
-                ns_query += ' AND n.current_section_id = ?'
-                params.append(section_id)
-            
-            if holder_id != 'all':
-                ns_query += ' AND n.current_holder = ?'
-                params.append(holder_id)
-            
-            if date_from:
-                ns_query += ' AND DATE(n.received_date) >= ?'
-                params.append(date_from)
-            
-            if date_to:
-                ns_query += ' AND DATE(n.received_date) <= ?'
-                params.append(date_to)
-            
-            if keywords:
-                ns_query += ' AND (n.subject LIKE ? OR n.notesheet_number LIKE ? OR n.sender_name LIKE ?)'
-                keyword_param = f'%{keywords}%'
-                params.extend([keyword_param, keyword_param, keyword_param])
-            
-            if doc_number:
-                ns_query += ' AND n.notesheet_number LIKE ?'
-                params.append(f'%{doc_number}%')
-            
-            if sender:
-                ns_query += ' AND n.sender_name LIKE ?'
-                params.append(f'%{sender}%')
-            
-            cursor.execute(ns_query, params)
-            ns_results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            results.extend([dict(zip(columns, row)) for row in ns_results])
-        
-        # Search Bills
-        if doc_type in ['all', 'bill']:
-            bill_query = '''
-                SELECT 
-                    'bill' as doc_type,
-                    b.bill_id as doc_id,
-                    b.bill_number as doc_number,
-                    b.vendor_name as subject,
-                    b.vendor_name as sender_name,
-                    b.priority,
-                    b.is_parked,
-                    b.payment_status as status,
-                    u.full_name as holder_name,
-                    s.section_name,
-                    b.received_date as in_date,
-                    CAST(julianday('now') - julianday(b.received_date) AS INTEGER) as days_held
-                FROM bills b
-                LEFT JOIN users u ON b.current_holder = u.user_id
-                LEFT JOIN sections s ON b.current_section_id = s.section_id
-                WHERE 1=1
-            '''
-            params = []
-            
-            if status == 'parked':
-                bill_query += ' AND b.is_parked = 1'
-            elif status == 'active':
-                bill_query += ' AND b.is_parked = 0'
-            elif status == 'cleared':
-                bill_query += ' AND b.payment_status = "Paid"'
-            
-            if priority != 'all':
-                bill_query += ' AND b.priority = ?'
-                params.append(priority)
-            
-            if section_id != 'all':
-                bill_query += ' AND b.current_section_id = ?'
-                params.append(section_id)
-            
-            if holder_id != 'all':
-                bill_query += ' AND b.current_holder = ?'
-                params.append(holder_id)
-            
-            if date_from:
-                bill_query += ' AND DATE(b.received_date) >= ?'
-                params.append(date_from)
-            
-            if date_to:
-                bill_query += ' AND DATE(b.received_date) <= ?'
-                params.append(date_to)
-            
-            if keywords:
-                bill_query += ' AND (b.vendor_name LIKE ? OR b.bill_number LIKE ? OR b.invoice_number LIKE ?)'
-                keyword_param = f'%{keywords}%'
-                params.extend([keyword_param, keyword_param, keyword_param])
-            
-            if doc_number:
-                bill_query += ' AND b.bill_number LIKE ?'
-                params.append(f'%{doc_number}%')
-            
-            if sender:
-                bill_query += ' AND b.vendor_name LIKE ?'
-                params.append(f'%{sender}%')
-            
-            cursor.execute(bill_query, params)
-            bill_results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            results.extend([dict(zip(columns, row)) for row in bill_results])
-        
-        # Search Letters (NEW!)
-        if doc_type in ['all', 'letter']:
-            letter_query = '''
-                SELECT 
-                    'letter' as doc_type,
-                    l.letter_id as doc_id,
-                    l.letter_number as doc_number,
-                    l.subject,
-                    l.sender_name,
-                    l.priority,
-                    l.is_parked,
-                    l.current_status as status,
-                    u.full_name as holder_name,
-                    s.section_name,
-                    l.received_date as in_date,
-                    CAST(julianday('now') - julianday(l.received_date) AS INTEGER) as days_held
-                FROM letters l
-                LEFT JOIN users u ON l.current_holder = u.user_id
-                LEFT JOIN sections s ON l.current_section_id = s.section_id
-                WHERE 1=1
-            '''
-            params = []
-            
-            if status == 'parked':
-                letter_query += ' AND l.is_parked = 1'
-            elif status == 'active':
-                letter_query += ' AND l.is_parked = 0'
-            elif status == 'closed':
-                letter_query += ' AND l.current_status = "Closed"'
-            
-            if priority != 'all':
-                letter_query += ' AND l.priority = ?'
-                params.append(priority)
-            
-            if section_id != 'all':
-                letter_query += ' AND l.current_section_id = ?'
-                params.append(section_id)
-            
-            if holder_id != 'all':
-                letter_query += ' AND l.current_holder = ?'
-                params.append(holder_id)
-            
-            if date_from:
-                letter_query += ' AND DATE(l.received_date) >= ?'
-                params.append(date_from)
-            
-            if date_to:
-                letter_query += ' AND DATE(l.received_date) <= ?'
-                params.append(date_to)
+    results = []
+    next_url = None
+    
+    # Only search if at least one filter is applied; an empty submit would
+    # otherwise page through every document of every type
+    has_filter = any([doc_type != 'all', status != 'all', priority != 'all', 
+                      section_id != 'all', holder_id != 'all', date_from, date_to, 
+                      min_days, keywords, doc_number, sender])
+    if request.args and not has_filter:
+        flash('Please choose at least one filter to search.', 'warning')
+    
+    if has_filter:
+        
+        # One SELECT per document type, run as a single UNION ALL
+        fts_tables = optional_tables()
+        now_jd = julian_now()
+        subqueries = []
+        params = []
+        for cfg in SEARCH_TABLES:
+            if doc_type in ['all', cfg['doc_type']]:
+                sql, sql_params = build_search_sql(cfg, filters, fts_tables, now_jd)
+                subqueries.append(sql)
+                params.extend(sql_params)
+        
+        # Minimum days held, ordering and paging are applied by SQLite. Oldest
+        # received first (= longest held); one extra row tells us there is a next page
+        if subqueries:
+            query = 'SELECT * FROM (' + ' UNION ALL '.join(subqueries) + ') WHERE 1=1'
+            if min_days:
+                query += ' AND days_held >= ?'
+                params.append(int(min_days))
             
-            if keywords:
-                letter_query += ' AND (l.subject LIKE ? OR l.letter_number LIKE ? OR l.sender_name LIKE ?)'
-                keyword_param = f'%{keywords}%'
-                params.extend([keyword_param, keyword_param, keyword_param])
+            cursor_position = page_cursor()
+            if cursor_position:
+                query += ' AND (in_date, doc_type, doc_id) > (?, ?, ?)'
+                params.extend(cursor_position)
             
-            if doc_number:
-                letter_query += ' AND l.letter_number LIKE ?'
-                params.append(f'%{doc_number}%')
+            query += ' ORDER BY in_date, doc_type, doc_id LIMIT ?'
+            params.append(SEARCH_PAGE_SIZE + 1)
             
-            if sender:
-                letter_query += ' AND l.sender_name LIKE ?'
-                params.append(f'%{sender}%')
+            execute_checked(cursor, query, params)
+            results, has_more = fetch_page(cursor, SEARCH_PAGE_SIZE)
+            if has_more:
+                next_url = next_page_url('advanced_search', results[-1])
             
-            cursor.execute(letter_query, params)
-            letter_results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            results.extend([dict(zip(columns, row)) for row in letter_results])
-        
-        # Filter by minimum days held
-        if min_days:
-            results = [r for r in results if r.get('days_held', 0) >= int(min_days)]
-        
-        # Sort by days_held descending
-        results.sort(key=lambda x: x.get('days_held', 0), reverse=True)
+            # Holder and section names come from the cached lookups, not joins;
+            # both are versioned, so a new holder's name shows at once
+            user_names = get_user_names()
+            section_names = get_section_names()
+            for row in results:
+                row['holder_name'] = user_names.get(row.pop('current_holder'))
+                row['section_name'] = section_names.get(row.pop('current_section_id'))
     
     # Get all sections for filter dropdown
-    sections = db.get_all_sections()
+    sections = get_sections()
     
     # Get all users for filter dropdown
-    cursor.execute('SELECT user_id, username, full_name FROM users WHERE is_active = 1 ORDER BY full_name')
-    users = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    users = [dict(zip(columns, row)) for row in users]
-    
-    db.close()
+    users = get_active_users()
     
     return render_template('advanced_search.html',
                          results=results,
+                         next_url=next_url,
+                         is_first_page=page_cursor() is None,
                          sections=sections,
                          users=users,
-                         filters={
-                             'doc_type': doc_type,
-                             'status': status,
-                             'priority': priority,
-                             'section_id': section_id,
-                             'holder_id': holder_id,
-                             'date_from': date_from,
-                             'date_to': date_to,
-                             'min_days': min_days,
-                             'keywords': keywords,
-                             'doc_number': doc_number,
-                             'sender': sender
-                         })
+                         filters=filters)
 
 
 """
@@ -836,9 +1280,7 @@ Works without current_movement_id - uses current_holder only
 @login_required
 def advanced_reports():
     """Generate advanced reports - UPDATED WITH LETTERS"""
-    db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
     
     report_type = request.args.get('report_type', '')
     date_from = request.args.get('date_from', '')
@@ -846,169 +1288,209 @@ def advanced_reports():
     
     report_data = None
     aging_summary = None
+    next_url = None
     
     if report_type:
         # Section Performance Report - UPDATED WITH LETTERS
         if report_type == 'section_performance':
-            query = '''
-                SELECT 
-                    s.section_name,
-                    COUNT(DISTINCT n.notesheet_id) + COUNT(DISTINCT b.bill_id) + COUNT(DISTINCT l.letter_id) as total_docs,
-                    AVG(julianday('now') - julianday(COALESCE(n.received_date, b.received_date, l.received_date))) as avg_days,
-                    SUM(CASE WHEN n.current_holder IS NOT NULL AND n.is_parked = 0 THEN 1 ELSE 0 END) +
-                    SUM(CASE WHEN b.current_holder IS NOT NULL AND b.is_parked = 0 THEN 1 ELSE 0 END) +
-                    SUM(CASE WHEN l.current_holder IS NOT NULL AND l.is_parked = 0 THEN 1 ELSE 0 END) as pending,
-                    SUM(CASE WHEN n.current_status = 'Closed' THEN 1 ELSE 0 END) +
-                    SUM(CASE WHEN b.payment_status = 'Paid' THEN 1 ELSE 0 END) +
-                    SUM(CASE WHEN l.current_status = 'Closed' THEN 1 ELSE 0 END) as cleared
-                FROM sections s
-                LEFT JOIN notesheets n ON s.section_id = n.current_section_id
-                LEFT JOIN bills b ON s.section_id = b.current_section_id
-                LEFT JOIN letters l ON s.section_id = l.current_section_id
-                WHERE 1=1
-            '''
-            params = []
-            
+            # One pass over each document table (UNION ALL), then group by section -
+            # joining all three tables to sections at once multiplied the rows
+            date_filter = ''
+            params = {'now': julian_now()}
             if date_from:
-                query += ' AND (n.received_date >= ? OR b.received_date >= ? OR l.received_date >= ?)'
-                params.extend([date_from, date_from, date_from])
-            
+                date_filter += ' AND received_date >= :date_from'
+                params['date_from'] = date_from
             if date_to:
-                query += ' AND (n.received_date <= ? OR b.received_date <= ? OR l.received_date <= ?)'
-                params.extend([date_to, date_to, date_to])
+                date_filter += ' AND received_date <= :date_to'
+                params['date_to'] = date_to
             
-            query += ' GROUP BY s.section_id HAVING total_docs > 0 ORDER BY avg_days DESC'
+            query = f'''
+                WITH docs AS (
+                    SELECT current_section_id as section_id, received_date,
+                           CASE WHEN current_holder IS NOT NULL AND is_parked = 0 THEN 1 ELSE 0 END as pending,
+                           CASE WHEN current_status = 'Closed' THEN 1 ELSE 0 END as cleared
+                    FROM notesheets WHERE 1=1 {date_filter}
+                    UNION ALL
+                    SELECT current_section_id, received_date,
+                           CASE WHEN current_holder IS NOT NULL AND is_parked = 0 THEN 1 ELSE 0 END,
+                           CASE WHEN payment_status = 'Paid' THEN 1 ELSE 0 END
+                    FROM bills WHERE 1=1 {date_filter}
+                    UNION ALL
+                    SELECT current_section_id, received_date,
+                           CASE WHEN current_holder IS NOT NULL AND is_parked = 0 THEN 1 ELSE 0 END,
+                           CASE WHEN current_status = 'Closed' THEN 1 ELSE 0 END
+                    FROM letters WHERE 1=1 {date_filter}
+                )
+                SELECT 
+                    s.section_name,
+                    COUNT(*) as total_docs,
+                    AVG(:now - julianday(d.received_date)) as avg_days,
+                    SUM(d.pending) as pending,
+                    SUM(d.cleared) as cleared
+                FROM docs d
+                JOIN sections s ON s.section_id = d.section_id
+                GROUP BY s.section_id
+                ORDER BY avg_days DESC
+            '''
             
-            cursor.execute(query, params)
-            results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            report_data = [dict(zip(columns, row)) for row in results]
+            execute_checked(cursor, query, params)
+            report_data = [dict(row) for row in cursor.fetchall()]
         
         # User Productivity Report - UPDATED WITH LETTERS
         elif report_type == 'user_productivity':
-            query = '''
+            # Movements forwarded and documents held are aggregated per user
+            # separately, then joined to users once
+            date_filter = ''
+            params = {'now': julian_now()}
+            if date_from:
+                date_filter += ' AND forwarded_date >= :date_from'
+                params['date_from'] = date_from
+            if date_to:
+                date_filter += ' AND forwarded_date <= :date_to'
+                params['date_to'] = date_to
+            
+            query = f'''
+                WITH processed AS (
+                    SELECT from_user as user_id, COUNT(*) as processed,
+                           AVG(:now - julianday(forwarded_date)) as avg_days
+                    FROM (
+                        SELECT from_user, forwarded_date FROM notesheet_movements WHERE 1=1 {date_filter}
+                        UNION ALL
+                        SELECT from_user, forwarded_date FROM bill_movements WHERE 1=1 {date_filter}
+                        UNION ALL
+                        SELECT from_user, forwarded_date FROM letter_movements WHERE 1=1 {date_filter}
+                    )
+                    GROUP BY from_user
+                ),
+                held AS (
+                    SELECT current_holder as user_id, COUNT(*) as holding
+                    FROM (
+                        SELECT current_holder FROM notesheets
+                        UNION ALL
+                        SELECT current_holder FROM bills
+                        UNION ALL
+                        SELECT current_holder FROM letters
+                    )
+                    GROUP BY current_holder
+                )
                 SELECT 
                     u.full_name,
                     s.section_name,
-                    COUNT(DISTINCT nm.movement_id) + COUNT(DISTINCT bm.movement_id) + COUNT(DISTINCT lm.movement_id) as processed,
-                    AVG(julianday('now') - julianday(COALESCE(nm.forwarded_date, bm.forwarded_date, lm.forwarded_date))) as avg_days,
-                    COUNT(DISTINCT n.notesheet_id) + COUNT(DISTINCT b.bill_id) + COUNT(DISTINCT l.letter_id) as holding
+                    p.processed,
+                    p.avg_days,
+                    COALESCE(h.holding, 0) as holding
                 FROM users u
+                JOIN processed p ON p.user_id = u.user_id
                 LEFT JOIN sections s ON u.section_id = s.section_id
-                LEFT JOIN notesheet_movements nm ON u.user_id = nm.from_user
-                LEFT JOIN bill_movements bm ON u.user_id = bm.from_user
-                LEFT JOIN letter_movements lm ON u.user_id = lm.from_user
-                LEFT JOIN notesheets n ON u.user_id = n.current_holder
-                LEFT JOIN bills b ON u.user_id = b.current_holder
-                LEFT JOIN letters l ON u.user_id = l.current_holder
+                LEFT JOIN held h ON h.user_id = u.user_id
                 WHERE u.is_active = 1 AND u.is_superuser = 0
+                ORDER BY p.processed DESC
+                LIMIT 20
             '''
-            params = []
-            
-            if date_from:
-                query += ' AND (nm.forwarded_date >= ? OR bm.forwarded_date >= ? OR lm.forwarded_date >= ?)'
-                params.extend([date_from, date_from, date_from])
-            
-            if date_to:
-                query += ' AND (nm.forwarded_date <= ? OR bm.forwarded_date <= ? OR lm.forwarded_date <= ?)'
-                params.extend([date_to, date_to, date_to])
             
-            query += ' GROUP BY u.user_id HAVING processed > 0 ORDER BY processed DESC LIMIT 20'
-            
-            cursor.execute(query, params)
-            results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            report_data = [dict(zip(columns, row)) for row in results]
+            execute_checked(cursor, query, params)
+            report_data = [dict(row) for row in cursor.fetchall()]
         
         # Document Aging Report - UPDATED WITH LETTERS
         elif report_type == 'document_aging':
-            # Get aging summary - using received_date as proxy
-            cursor.execute('''
-                SELECT 
-                    SUM(CASE WHEN days_held <= 3 THEN 1 ELSE 0 END) as fresh,
-                    SUM(CASE WHEN days_held > 3 AND days_held <= 7 THEN 1 ELSE 0 END) as moderate,
-                    SUM(CASE WHEN days_held > 7 AND days_held <= 14 THEN 1 ELSE 0 END) as old,
-                    SUM(CASE WHEN days_held > 14 THEN 1 ELSE 0 END) as critical
-                FROM (
+            now_jd = julian_now()
+            
+            # Get aging summary - using received_date as proxy. Each bucket is a
+            # received_date range, counted on the ix_*_active partial indexes
+            aging_summary = {}
+            now = datetime.utcnow()
+            for bucket, newer_than, up_to in AGING_BUCKETS:
+                conditions = 'is_parked = 0 AND current_holder IS NOT NULL'
+                params = []
+                if newer_than is not None:
+                    conditions += ' AND received_date > ?'
+                    params.append(aging_cutoff(now, newer_than))
+                if up_to is not None:
+                    conditions += ' AND received_date <= ?'
+                    params.append(aging_cutoff(now, up_to))
+                cursor.execute(f'''
+                    SELECT (SELECT COUNT(*) FROM notesheets WHERE {conditions}) +
+                           (SELECT COUNT(*) FROM bills WHERE {conditions}) +
+                           (SELECT COUNT(*) FROM letters WHERE {conditions})
+                ''', params * 3)
+                aging_summary[bucket] = cursor.fetchone()[0]
+            
+            # Get detailed aging data, longest held first, one page at a time
+            query = '''
+                SELECT * FROM (
                     SELECT 
-                        CAST(julianday('now') - julianday(received_date) AS INTEGER) as days_held
-                    FROM notesheets
-                    WHERE is_parked = 0 AND current_holder IS NOT NULL
+                        'notesheet' as doc_type,
+                        n.notesheet_id as doc_id,
+                        n.notesheet_number as doc_number,
+                        n.subject,
+                        u.full_name as holder_name,
+                        n.priority,
+                        n.received_date as in_date,
+                        CAST(:now - julianday(n.received_date) AS INTEGER) as days_held
+                    FROM notesheets n
+                    LEFT JOIN users u ON n.current_holder = u.user_id
+                    WHERE n.is_parked = 0 AND n.current_holder IS NOT NULL
                     UNION ALL
                     SELECT 
-                        CAST(julianday('now') - julianday(received_date) AS INTEGER) as days_held
-                    FROM bills
-                    WHERE is_parked = 0 AND current_holder IS NOT NULL
+                        'bill' as doc_type,
+                        b.bill_id as doc_id,
+                        b.bill_number as doc_number,
+                        b.vendor_name as subject,
+                        u.full_name as holder_name,
+                        b.priority,
+                        b.received_date as in_date,
+                        CAST(:now - julianday(b.received_date) AS INTEGER) as days_held
+                    FROM bills b
+                    LEFT JOIN users u ON b.current_holder = u.user_id
+                    WHERE b.is_parked = 0 AND b.current_holder IS NOT NULL
                     UNION ALL
                     SELECT 
-                        CAST(julianday('now') - julianday(received_date) AS INTEGER) as days_held
-                    FROM letters
-                    WHERE is_parked = 0 AND current_holder IS NOT NULL
-                )
-            ''')
-            aging_result = cursor.fetchone()
-            aging_summary = dict(zip(['fresh', 'moderate', 'old', 'critical'], aging_result)) if aging_result else {'fresh': 0, 'moderate': 0, 'old': 0, 'critical': 0}
-            
-            # Get detailed aging data
-            query = '''
-                SELECT 
-                    'notesheet' as doc_type,
-                    n.notesheet_id as doc_id,
-                    n.notesheet_number as doc_number,
-                    n.subject,
-                    u.full_name as holder_name,
-                    n.priority,
-                    CAST(julianday('now') - julianday(n.received_date) AS INTEGER) as days_held
-                FROM notesheets n
-                LEFT JOIN users u ON n.current_holder = u.user_id
-                WHERE n.is_parked = 0 AND n.current_holder IS NOT NULL
-                UNION ALL
-                SELECT 
-                    'bill' as doc_type,
-                    b.bill_id as doc_id,
-                    b.bill_number as doc_number,
-                    b.vendor_name as subject,
-                    u.full_name as holder_name,
-                    b.priority,
-                    CAST(julianday('now') - julianday(b.received_date) AS INTEGER) as days_held
-                FROM bills b
-                LEFT JOIN users u ON b.current_holder = u.user_id
-                WHERE b.is_parked = 0 AND b.current_holder IS NOT NULL
-                UNION ALL
-                SELECT 
-                    'letter' as doc_type,
-                    l.letter_id as doc_id,
-                    l.letter_number as doc_number,
-                    l.subject,
-                    u.full_name as holder_name,
-                    l.priority,
-                    CAST(julianday('now') - julianday(l.received_date) AS INTEGER) as days_held
-                FROM letters l
-                LEFT JOIN users u ON l.current_holder = u.user_id
-                WHERE l.is_parked = 0 AND l.current_holder IS NOT NULL
-                ORDER BY days_held DESC
-                LIMIT 50
+                        'letter' as doc_type,
+                        l.letter_id as doc_id,
+                        l.letter_number as doc_number,
+                        l.subject,
+                        u.full_name as holder_name,
+                        l.priority,
+                        l.received_date as in_date,
+                        CAST(:now - julianday(l.received_date) AS INTEGER) as days_held
+                    FROM letters l
+                    LEFT JOIN users u ON l.current_holder = u.user_id
+                    WHERE l.is_parked = 0 AND l.current_holder IS NOT NULL
+                ) WHERE 1=1
             '''
+            params = {'now': now_jd, 'limit': AGING_PAGE_SIZE + 1}
+            
+            cursor_position = page_cursor()
+            if cursor_position:
+                query += ' AND (in_date, doc_type, doc_id) > (:after_date, :after_type, :after_id)'
+                params.update(zip(('after_date', 'after_type', 'after_id'), cursor_position))
             
-            cursor.execute(query)
-            results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            report_data = [dict(zip(columns, row)) for row in results]
+            query += ' ORDER BY in_date, doc_type, doc_id LIMIT :limit'
+            
+            execute_checked(cursor, query, params)
+            report_data, has_more = fetch_page(cursor, AGING_PAGE_SIZE)
+            if has_more:
+                next_url = next_page_url('advanced_reports', report_data[-1])
         
         # Bottleneck Analysis Report - UPDATED WITH LETTERS
         elif report_type == 'bottleneck_analysis':
             query = '''
+                WITH held AS (
+                    SELECT current_holder as user_id, received_date FROM notesheets WHERE is_parked = 0
+                    UNION ALL
+                    SELECT current_holder, received_date FROM bills WHERE is_parked = 0
+                    UNION ALL
+                    SELECT current_holder, received_date FROM letters WHERE is_parked = 0
+                )
                 SELECT 
                     s.section_name,
                     u.full_name as user_name,
-                    COUNT(DISTINCT n.notesheet_id) + COUNT(DISTINCT b.bill_id) + COUNT(DISTINCT l.letter_id) as pending_count,
-                    AVG(julianday('now') - julianday(COALESCE(n.received_date, b.received_date, l.received_date))) as avg_wait_days,
-                    MAX(julianday('now') - julianday(COALESCE(n.received_date, b.received_date, l.received_date))) as max_wait_days
-                FROM users u
+                    COUNT(*) as pending_count,
+                    AVG(:now - julianday(h.received_date)) as avg_wait_days,
+                    MAX(:now - julianday(h.received_date)) as max_wait_days
+                FROM held h
+                JOIN users u ON u.user_id = h.user_id
                 JOIN sections s ON u.section_id = s.section_id
-                LEFT JOIN notesheets n ON u.user_id = n.current_holder AND n.is_parked = 0
-                LEFT JOIN bills b ON u.user_id = b.current_holder AND b.is_parked = 0
-                LEFT JOIN letters l ON u.user_id = l.current_holder AND l.is_parked = 0
                 WHERE u.is_active = 1
                 GROUP BY u.user_id
                 HAVING pending_count > 2
@@ -1016,12 +1498,48 @@ def advanced_reports():
                 LIMIT 20
             '''
             
-            cursor.execute(query)
-            results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            report_data = [dict(zip(columns, row)) for row in results]
+            execute_checked(cursor, query, {'now': julian_now()})
+            report_data = [dict(row) for row in cursor.fetchall()]
         
         # Monthly Summary Report - UPDATED WITH LETTERS
+        elif report_type == 'monthly_summary' and 'report_monthly' in optional_tables():
+            # Read the per-month counters kept by the add_report_rollups.py triggers;
+            # average days = today - average received date
+            query = '''
+                SELECT
+                    month,
+                    notesheets_received, bills_received, letters_received,
+                    notesheets_cleared, bills_paid, letters_closed,
+                    CASE WHEN avg_notesheet_days > 0 THEN avg_notesheet_days END as avg_notesheet_days,
+                    CASE WHEN avg_bill_days > 0 THEN avg_bill_days END as avg_bill_days,
+                    CASE WHEN avg_letter_days > 0 THEN avg_letter_days END as avg_letter_days
+                FROM (
+                    SELECT
+                        month,
+                        SUM(CASE WHEN doc_type = 'notesheet' THEN received ELSE 0 END) as notesheets_received,
+                        SUM(CASE WHEN doc_type = 'bill' THEN received ELSE 0 END) as bills_received,
+                        SUM(CASE WHEN doc_type = 'letter' THEN received ELSE 0 END) as letters_received,
+                        SUM(CASE WHEN doc_type = 'notesheet' THEN cleared ELSE 0 END) as notesheets_cleared,
+                        SUM(CASE WHEN doc_type = 'bill' THEN cleared ELSE 0 END) as bills_paid,
+                        SUM(CASE WHEN doc_type = 'letter' THEN cleared ELSE 0 END) as letters_closed,
+                        MAX(CASE WHEN doc_type = 'notesheet'
+                                 THEN :now - received_julian_sum / received END) as avg_notesheet_days,
+                        MAX(CASE WHEN doc_type = 'bill'
+                                 THEN :now - received_julian_sum / received END) as avg_bill_days,
+                        MAX(CASE WHEN doc_type = 'letter'
+                                 THEN :now - received_julian_sum / received END) as avg_letter_days
+                    FROM report_monthly
+                    WHERE received > 0 AND month >= strftime('%Y-%m', 'now', '-12 months')
+                    GROUP BY month
+                )
+                ORDER BY month DESC
+                LIMIT 12
+            '''
+            
+            execute_checked(cursor, query, {'now': julian_now()})
+            report_data = [dict(row) for row in cursor.fetchall()]
+        
+        # Monthly Summary without the rollup table - aggregate the documents directly
         elif report_type == 'monthly_summary':
             query = '''
                 SELECT 
@@ -1044,7 +1562,7 @@ def advanced_reports():
                         SUM(CASE WHEN current_status = 'Closed' THEN 1 ELSE 0 END) as notesheets_cleared,
                         0 as bills_paid,
                         0 as letters_closed,
-                        AVG(julianday('now') - julianday(received_date)) as avg_notesheet_days,
+                        AVG(:now - julianday(received_date)) as avg_notesheet_days,
                         0 as avg_bill_days,
                         0 as avg_letter_days
                     FROM notesheets
@@ -1060,7 +1578,7 @@ def advanced_reports():
                         SUM(CASE WHEN payment_status = 'Paid' THEN 1 ELSE 0 END) as bills_paid,
                         0 as letters_closed,
                         0 as avg_notesheet_days,
-                        AVG(julianday('now') - julianday(received_date)) as avg_bill_days,
+                        AVG(:now - julianday(received_date)) as avg_bill_days,
                         0 as avg_letter_days
                     FROM bills
                     WHERE strftime('%Y-%m', received_date) >= strftime('%Y-%m', 'now', '-12 months')
@@ -1076,7 +1594,7 @@ def advanced_reports():
                         SUM(CASE WHEN current_status = 'Closed' THEN 1 ELSE 0 END) as letters_closed,
                         0 as avg_notesheet_days,
                         0 as avg_bill_days,
-                        AVG(julianday('now') - julianday(received_date)) as avg_letter_days
+                        AVG(:now - julianday(received_date)) as avg_letter_days
                     FROM letters
                     WHERE strftime('%Y-%m', received_date) >= strftime('%Y-%m', 'now', '-12 months')
                     GROUP BY month
@@ -1086,10 +1604,8 @@ def advanced_reports():
                 LIMIT 12
             '''
             
-            cursor.execute(query)
-            results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            report_data = [dict(zip(columns, row)) for row in results]
+            execute_checked(cursor, query, {'now': julian_now()})
+            report_data = [dict(row) for row in cursor.fetchall()]
         
         # Priority Analysis Report - UPDATED WITH LETTERS
         elif report_type == 'priority_analysis':
@@ -1100,7 +1616,7 @@ def advanced_reports():
                     COUNT(*) as total_count,
                     SUM(CASE WHEN is_parked = 0 AND current_status != 'Closed' THEN 1 ELSE 0 END) as active_count,
                     SUM(CASE WHEN is_parked = 1 THEN 1 ELSE 0 END) as parked_count,
-                    AVG(julianday('now') - julianday(received_date)) as avg_age_days
+                    AVG(:now - julianday(received_date)) as avg_age_days
                 FROM notesheets
                 GROUP BY priority
                 UNION ALL
@@ -1110,7 +1626,7 @@ def advanced_reports():
                     COUNT(*) as total_count,
                     SUM(CASE WHEN is_parked = 0 AND payment_status = 'Pending' THEN 1 ELSE 0 END) as active_count,
                     SUM(CASE WHEN is_parked = 1 THEN 1 ELSE 0 END) as parked_count,
-                    AVG(julianday('now') - julianday(received_date)) as avg_age_days
+                    AVG(:now - julianday(received_date)) as avg_age_days
                 FROM bills
                 GROUP BY priority
                 UNION ALL
@@ -1120,16 +1636,14 @@ def advanced_reports():
                     COUNT(*) as total_count,
                     SUM(CASE WHEN is_parked = 0 AND current_status NOT IN ('Closed', 'Replied') THEN 1 ELSE 0 END) as active_count,
                     SUM(CASE WHEN is_parked = 1 THEN 1 ELSE 0 END) as parked_count,
-                    AVG(julianday('now') - julianday(received_date)) as avg_age_days
+                    AVG(:now - julianday(received_date)) as avg_age_days
                 FROM letters
                 GROUP BY priority
                 ORDER BY priority, doc_type
             '''
             
-            cursor.execute(query)
-            results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            report_data = [dict(zip(columns, row)) for row in results]
+            execute_checked(cursor, query, {'now': julian_now()})
+            report_data = [dict(row) for row in cursor.fetchall()]
         
         # SLA Compliance Report - UPDATED WITH LETTERS
         elif report_type == 'sla_compliance':
@@ -1140,105 +1654,61 @@ def advanced_reports():
                 'Normal': 10
             }
             
-            report_data = []
-            
-            for priority, sla_days in SLA_LIMITS.items():
-                # Notesheets - using received_date since no movement date available
-                cursor.execute('''
-                    SELECT 
-                        COUNT(*) as total,
-                        SUM(CASE 
-                            WHEN CAST(julianday('now') - julianday(received_date) AS INTEGER) <= ? 
-                            THEN 1 ELSE 0 
-                        END) as within_sla,
-                        SUM(CASE 
-                            WHEN CAST(julianday('now') - julianday(received_date) AS INTEGER) > ? 
-                            THEN 1 ELSE 0 
-                        END) as breached_sla
+            # One pass over the active documents of all three types, matched
+            # against a VALUES list of the SLA limits
+            params = {'now': julian_now()}
+            sla_rows = []
+            for order, (priority, sla_days) in enumerate(SLA_LIMITS.items()):
+                params[f'priority{order}'] = priority
+                params[f'sla_days{order}'] = sla_days
+                sla_rows.append(f'(:priority{order}, :sla_days{order}, {order})')
+            sla_rows = ', '.join(sla_rows)
+            query = f'''
+                WITH sla(priority, sla_days, sla_order) AS (VALUES {sla_rows}),
+                docs AS (
+                    SELECT 'Notesheet' as doc_type, 1 as type_order, priority, received_date
                     FROM notesheets
-                    WHERE priority = ? AND is_parked = 0 AND current_holder IS NOT NULL
-                ''', (sla_days, sla_days, priority))
-                
-                ns_result = cursor.fetchone()
-                
-                if ns_result and ns_result[0] > 0:
-                    compliance = (ns_result[1] / ns_result[0]) * 100 if ns_result[0] > 0 else 0
-                    report_data.append({
-                        'priority': priority,
-                        'doc_type': 'Notesheet',
-                        'sla_days': sla_days,
-                        'total_docs': ns_result[0],
-                        'within_sla': ns_result[1],
-                        'breached_sla': ns_result[2],
-                        'compliance_percent': round(compliance, 1)
-                    })
-                
-                # Bills
-                cursor.execute('''
-                    SELECT 
-                        COUNT(*) as total,
-                        SUM(CASE 
-                            WHEN CAST(julianday('now') - julianday(received_date) AS INTEGER) <= ? 
-                            THEN 1 ELSE 0 
-                        END) as within_sla,
-                        SUM(CASE 
-                            WHEN CAST(julianday('now') - julianday(received_date) AS INTEGER) > ? 
-                            THEN 1 ELSE 0 
-                        END) as breached_sla
+                    WHERE is_parked = 0 AND current_holder IS NOT NULL
+                    UNION ALL
+                    SELECT 'Bill', 2, priority, received_date
                     FROM bills
-                    WHERE priority = ? AND is_parked = 0 AND current_holder IS NOT NULL
-                ''', (sla_days, sla_days, priority))
-                
-                bill_result = cursor.fetchone()
-                
-                if bill_result and bill_result[0] > 0:
-                    compliance = (bill_result[1] / bill_result[0]) * 100 if bill_result[0] > 0 else 0
-                    report_data.append({
-                        'priority': priority,
-                        'doc_type': 'Bill',
-                        'sla_days': sla_days,
-                        'total_docs': bill_result[0],
-                        'within_sla': bill_result[1],
-                        'breached_sla': bill_result[2],
-                        'compliance_percent': round(compliance, 1)
-                    })
-                
-                # Letters - NEW!
-                cursor.execute('''
-                    SELECT 
-                        COUNT(*) as total,
-                        SUM(CASE 
-                            WHEN CAST(julianday('now') - julianday(received_date) AS INTEGER) <= ? 
-                            THEN 1 ELSE 0 
-                        END) as within_sla,
-                        SUM(CASE 
-                            WHEN CAST(julianday('now') - julianday(received_date) AS INTEGER) > ? 
-                            THEN 1 ELSE 0 
-                        END) as breached_sla
+                    WHERE is_parked = 0 AND current_holder IS NOT NULL
+                    UNION ALL
+                    SELECT 'Letter', 3, priority, received_date
                     FROM letters
-                    WHERE priority = ? AND is_parked = 0 AND current_holder IS NOT NULL
-                ''', (sla_days, sla_days, priority))
-                
-                letter_result = cursor.fetchone()
-                
-                if letter_result and letter_result[0] > 0:
-                    compliance = (letter_result[1] / letter_result[0]) * 100 if letter_result[0] > 0 else 0
-                    report_data.append({
-                        'priority': priority,
-                        'doc_type': 'Letter',
-                        'sla_days': sla_days,
-                        'total_docs': letter_result[0],
-                        'within_sla': letter_result[1],
-                        'breached_sla': letter_result[2],
-                        'compliance_percent': round(compliance, 1)
-                    })
-    
-    db.close()
+                    WHERE is_parked = 0 AND current_holder IS NOT NULL
+                )
+                SELECT 
+                    sla.priority,
+                    docs.doc_type,
+                    sla.sla_days,
+                    COUNT(*) as total_docs,
+                    SUM(CASE 
+                        WHEN CAST(:now - julianday(docs.received_date) AS INTEGER) <= sla.sla_days 
+                        THEN 1 ELSE 0 
+                    END) as within_sla,
+                    SUM(CASE 
+                        WHEN CAST(:now - julianday(docs.received_date) AS INTEGER) > sla.sla_days 
+                        THEN 1 ELSE 0 
+                    END) as breached_sla
+                FROM sla
+                JOIN docs ON docs.priority = sla.priority
+                GROUP BY sla.priority, docs.doc_type
+                ORDER BY MIN(sla.sla_order), MIN(docs.type_order)
+            '''
+            
+            execute_checked(cursor, query, params)
+            report_data = []
+            for row in cursor.fetchall():
+                row = dict(row)
+                row['compliance_percent'] = round((row['within_sla'] / row['total_docs']) * 100, 1)
+                report_data.append(row)
     
     return render_template('advanced_reports.html',
                          report_type=report_type,
                          report_data=report_data,
                          aging_summary=aging_summary,
+                         next_url=next_url,
                          date_from=date_from,
                          date_to=date_to)
 
@@ -1248,57 +1718,40 @@ def advanced_reports():
 @login_required
 def notesheets_list():
     """List all notesheets"""
-    db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
     
     # Get search and filter parameters
     search = request.args.get('search', '')
     status = request.args.get('status', '')
     
-    # Build query with section info
-    query = '''
-        SELECT 
-            n.notesheet_id, n.notesheet_number, n.subject, n.sender_name,
-            n.received_date, n.current_status, n.priority, n.is_parked,
-            u.full_name as current_holder_name,
-            s.section_name as current_section_name
-        FROM notesheets n
-        LEFT JOIN users u ON n.current_holder = u.user_id
-        LEFT JOIN sections s ON n.current_section_id = s.section_id
-        WHERE 1=1
-    '''
-    params = []
-    
+    # Same matching as Advanced Search keywords (FTS5 index when available)
+    keyword_sql, params = '', []
     if search:
-        query += ' AND (n.notesheet_number LIKE ? OR n.subject LIKE ? OR n.sender_name LIKE ?)'
-        search_param = f'%{search}%'
-        params.extend([search_param, search_param, search_param])
+        keyword_sql, params = keyword_condition(SEARCH_TABLE_CONFIG['notesheets'], search, optional_tables())
     
     if status:
-        query += ' AND n.current_status = ?'
         params.append(status)
     
-    query += ' ORDER BY n.received_date DESC'
+    # Newest first, a page at a time; ties on received_date go by id
+    after = list_page_cursor()
+    if after:
+        params.extend([after[0], after[0], after[1]])
+    params.append(LIST_PAGE_SIZE + 1)
     
+    query = list_sql('notesheets', keyword_sql, bool(status), bool(after))
     cursor.execute(query, params)
-    notesheets = cursor.fetchall()
+    notesheets, has_more = fetch_page(cursor, LIST_PAGE_SIZE)
+    next_url, first_url = list_page_urls('notesheets_list', notesheets, has_more, 'received_date', 'notesheet_id')
     
-    # Convert to list of dicts
-    columns = [desc[0] for desc in cursor.description]
-    notesheets = [dict(zip(columns, row)) for row in notesheets]
-    
-    db.close()
-    
-    return render_template('notesheets/list.html', notesheets=notesheets)
+    return render_template('notesheets/list.html', notesheets=notesheets,
+                         next_url=next_url,
+                         first_url=first_url)
 
 @app.route('/notesheets/<int:notesheet_id>')
 @login_required
 def notesheet_detail(notesheet_id):
     """View notesheet details"""
-    db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
     
     # Get notesheet details with section info and time tracking
     cursor.execute('''
@@ -1308,160 +1761,67 @@ def notesheet_detail(notesheet_id):
             u2.full_name as received_by_name,
             s.section_name as current_section_name,
             ss.sub_section_name as current_sub_section_name,
-            CAST((julianday('now') - julianday(
-                (SELECT forwarded_date FROM notesheet_movements 
-                 WHERE notesheet_id = n.notesheet_id AND is_current = 1 
-                 ORDER BY forwarded_date DESC LIMIT 1)
-            )) AS INTEGER) as days_held,
-            CAST((julianday('now') - julianday(
-                (SELECT forwarded_date FROM notesheet_movements 
-                 WHERE notesheet_id = n.notesheet_id AND is_current = 1 
-                 ORDER BY forwarded_date DESC LIMIT 1)
-            )) * 24 AS INTEGER) as hours_held
+            CAST(cm.held_days AS INTEGER) as days_held,
+            CAST(cm.held_days * 24 AS INTEGER) as hours_held
         FROM notesheets n
         LEFT JOIN users u1 ON n.current_holder = u1.user_id
         LEFT JOIN users u2 ON n.received_by = u2.user_id
         LEFT JOIN sections s ON n.current_section_id = s.section_id
         LEFT JOIN sub_sections ss ON n.current_sub_section_id = ss.sub_section_id
+        LEFT JOIN (
+            SELECT notesheet_id, julianday('now') - julianday(MAX(forwarded_date)) as held_days
+            FROM notesheet_movements
+            WHERE notesheet_id = ? AND is_current = 1
+            GROUP BY notesheet_id
+        ) cm ON cm.notesheet_id = n.notesheet_id
         WHERE n.notesheet_id = ?
-    ''', (notesheet_id,))
+    ''', (notesheet_id, notesheet_id))
     
     notesheet = cursor.fetchone()
     
     if not notesheet:
-        db.close()
         flash('Notesheet not found.', 'error')
         return redirect(url_for('notesheets_list'))
     
     # Convert to dict
-    columns = [desc[0] for desc in cursor.description]
-    notesheet = dict(zip(columns, notesheet))
+    notesheet = dict(notesheet)
     
-    # === COMPREHENSIVE DEBUG ===
-    print("=" * 80)
-    print(f"NOTESHEET #{notesheet_id} DETAIL - COMPREHENSIVE DEBUG")
-    print("=" * 80)
-    print(f"Current User: ID={current_user.id}, Username={current_user.username}")
-    print(f"Current User Section ID: {current_user.section_id}")
-    print(f"Is Section Head: {current_user.is_section_head()}")
-    print(f"Is Receive Section: {current_user.is_receive_section()}")
-    print(f"Is Superuser: {current_user.is_superuser}")
-    print(f"Notesheet Current Holder: {notesheet['current_holder']}")
-    print(f"Holder matches current user: {notesheet['current_holder'] == current_user.id}")
-    print("=" * 80)
+    if app.logger.isEnabledFor(logging.DEBUG):
+        app.logger.debug('Notesheet #%s detail: user=%s (%s) section=%s section_head=%s '
+                         'receive_section=%s superuser=%s current_holder=%s',
+                         notesheet_id, current_user.id, current_user.username,
+                         current_user.section_id, current_user.is_section_head(),
+                         current_user.is_receive_section(), current_user.is_superuser,
+                         notesheet['current_holder'])
     
     # Get movement history with section info (newest first - DESC)
     cursor.execute('''
         SELECT 
             nm.*,
-            u1.full_name as from_user_name,
-            u2.full_name as to_user_name,
-            u3.full_name as forwarded_by_name,
-            s1.section_name as from_section_name,
-            s2.section_name as to_section_name,
-            DATE(nm.forwarded_date) as forward_date_only
+            DATE(nm.forwarded_date) as forward_date_only,
+            LAG(DATE(nm.forwarded_date)) OVER w as next_date_only,
+            CAST(julianday(CASE WHEN ROW_NUMBER() OVER w = 1 THEN :today
+                                ELSE LAG(DATE(nm.forwarded_date)) OVER w END)
+                 - julianday(DATE(nm.forwarded_date)) AS INTEGER) as days_held
         FROM notesheet_movements nm
-        LEFT JOIN users u1 ON nm.from_user = u1.user_id
-        LEFT JOIN users u2 ON nm.to_user = u2.user_id
-        LEFT JOIN users u3 ON nm.forwarded_by = u3.user_id
-        LEFT JOIN sections s1 ON nm.from_section_id = s1.section_id
-        LEFT JOIN sections s2 ON nm.to_section_id = s2.section_id
-        WHERE nm.notesheet_id = ?
+        WHERE nm.notesheet_id = :notesheet_id
+        WINDOW w AS (ORDER BY nm.movement_id DESC)
         ORDER BY nm.movement_id DESC
-    ''', (notesheet_id,))
-    
-    movements = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    movements = [dict(zip(columns, row)) for row in movements]
-    
-    # Calculate days held - CORRECTED
-    # movements[0] = newest (current), movements[-1] = oldest (initial receipt)
-    from datetime import datetime as dt
-    for i, movement in enumerate(movements):
-        movement['display_date'] = movement['forward_date_only']
-        
-        if i == 0:
-            # Current/newest location - still here
-            try:
-                in_date = dt.strptime(movement['forward_date_only'], '%Y-%m-%d').date()
-                today = dt.now().date()
-                days_diff = (today - in_date).days
-                
-                movement['in_date'] = movement['forward_date_only']
-                movement['out_date'] = 'Present'
-                
-                if days_diff == 0:
-                    movement['time_held'] = "Today (current)"
-                elif days_diff == 1:
-                    movement['time_held'] = "1 day (current)"
-                else:
-                    movement['time_held'] = f"{days_diff} days (current)"
-            except:
-                movement['time_held'] = "Unknown (current)"
-        elif i == len(movements) - 1:
-            # Oldest movement (initial receipt) - always calculate OUT to next movement
-            movement['in_date'] = movement['forward_date_only']
-            if len(movements) > 1:
-                # There IS a next movement - calculate OUT date
-                try:
-                    in_date_str = movement['forward_date_only']
-                    out_date_str = movements[i-1]['forward_date_only']
-                    
-                    # Handle None values
-                    if not in_date_str or not out_date_str:
-                        movement['out_date'] = 'N/A'
-                        movement['time_held'] = "Missing date"
-                    else:
-                        in_date = dt.strptime(str(in_date_str), '%Y-%m-%d').date()
-                        out_date = dt.strptime(str(out_date_str), '%Y-%m-%d').date()
-                        days_diff = (out_date - in_date).days
-                        
-                        movement['out_date'] = out_date_str
-                        
-                        if days_diff < 0:
-                            movement['time_held'] = f"{abs(days_diff)} days (ERROR: OUT before IN)"
-                        elif days_diff == 0:
-                            movement['time_held'] = "Same day"
-                        elif days_diff == 1:
-                            movement['time_held'] = "1 day"
-                        else:
-                            movement['time_held'] = f"{days_diff} days"
-                except Exception as e:
-                    # Even on error, set OUT date if available
-                    if i > 0 and movements[i-1].get('forward_date_only'):
-                        movement['out_date'] = movements[i-1]['forward_date_only']
-                    else:
-                        movement['out_date'] = 'N/A'
-                    movement['time_held'] = f"Error: {str(e)[:30]}"
-            else:
-                # Only one movement - still at initial receipt
-                movement['out_date'] = 'Present'
-                movement['time_held'] = "Still here (current)"
-        else:
-            # Middle movements - calculate time from IN to next movement
-            try:
-                in_date = dt.strptime(movement['forward_date_only'], '%Y-%m-%d').date()
-                out_date = dt.strptime(movements[i-1]['forward_date_only'], '%Y-%m-%d').date()
-                days_diff = (out_date - in_date).days
-                
-                movement['in_date'] = movement['forward_date_only']
-                movement['out_date'] = movements[i-1]['forward_date_only']
-                
-                if days_diff < 0:
-                    # Negative days - data issue, don't show OUT
-                    movement['out_date'] = 'N/A'
-                    movement['time_held'] = "Data error"
-                elif days_diff == 0:
-                    movement['time_held'] = "Same day"
-                elif days_diff == 1:
-                    movement['time_held'] = "1 day"
-                else:
-                    movement['time_held'] = f"{days_diff} days"
-            except:
-                movement['time_held'] = "Unknown"
+        LIMIT :limit
+    ''', {'notesheet_id': notesheet_id, 'today': datetime.now().date().isoformat(), 'limit': movements_limit()})
+    
+    # Days held were worked out in SQL; add the IN/OUT/time-held labels.
+    # Long histories show the latest page, with a link to the full list
+    movements, more_movements = fetch_movements(cursor)
+    movement_count = len(movements)
+    all_movements_url = None
+    if more_movements:
+        cursor.execute('SELECT COUNT(*) FROM notesheet_movements WHERE notesheet_id = ?', (notesheet_id,))
+        movement_count = cursor.fetchone()[0]
+        all_movements_url = url_for('notesheet_detail', notesheet_id=notesheet_id, all=1)
     
     # Get sections for forwarding dropdown
-    sections = db.get_all_sections()
+    sections = get_sections()
     
     # Determine who can forward based on role
     can_forward = False
@@ -1474,15 +1834,7 @@ def notesheet_detail(notesheet_id):
         # Receive section can ALWAYS forward to any section, regardless of current holder
         # Exclude current holder and superusers from list
         can_forward = True
-        cursor.execute('''
-            SELECT u.user_id, u.full_name, u.designation, s.section_name, u.section_id
-            FROM users u
-            LEFT JOIN sections s ON u.section_id = s.section_id
-            WHERE u.is_active = 1 
-            AND u.user_id != ?
-            AND u.is_superuser = 0
-            ORDER BY s.section_name, u.full_name
-        ''', (current_holder_id,))
+        users = [user for user in get_forward_targets() if user['user_id'] != current_holder_id]
         
     elif current_user.is_section_head() and notesheet['current_holder'] == current_user.id:
         # Section heads can forward if they are the current holder
@@ -1491,82 +1843,27 @@ def notesheet_detail(notesheet_id):
         # 2. Other section heads
         # 3. Receive section users
         can_forward = True
-        
-        print(f"DEBUG NOTESHEET: User ID={current_user.id}, Section ID={current_user.section_id}")
-        
-        cursor.execute('''
-            SELECT DISTINCT u.user_id, u.full_name, u.designation, s.section_name, u.section_id
-            FROM users u
-            LEFT JOIN sections s ON u.section_id = s.section_id
-            LEFT JOIN user_role_mapping urm ON u.user_id = urm.user_id
-            LEFT JOIN user_roles ur ON urm.role_id = ur.role_id
-            WHERE u.is_active = 1 
-            AND u.user_id != ?
-            AND u.is_superuser = 0
-            AND (
-                u.section_id = ?
-                OR ur.role_name = 'section_head'
-                OR ur.role_name = 'receive_section'
-            )
-            ORDER BY s.section_name, u.full_name
-        ''', (current_user.id, current_user.section_id))
-        
-        test_users = cursor.fetchall()
-        print(f"DEBUG NOTESHEET: Query returned {len(test_users)} users")
-        for usr in test_users:
-            print(f"DEBUG NOTESHEET:   {usr}")
-        
-        # Reset cursor for actual use
-        cursor.execute('''
-            SELECT DISTINCT u.user_id, u.full_name, u.designation, s.section_name, u.section_id
-            FROM users u
-            LEFT JOIN sections s ON u.section_id = s.section_id
-            LEFT JOIN user_role_mapping urm ON u.user_id = urm.user_id
-            LEFT JOIN user_roles ur ON urm.role_id = ur.role_id
-            WHERE u.is_active = 1 
-            AND u.user_id != ?
-            AND u.is_superuser = 0
-            AND (
-                u.section_id = ?
-                OR ur.role_name = 'section_head'
-                OR ur.role_name = 'receive_section'
-            )
-            ORDER BY s.section_name, u.full_name
-        ''', (current_user.id, current_user.section_id))
+        cursor.execute(SECTION_HEAD_FORWARD_USERS_SQL,
+                       {'user_id': current_user.id, 'section_id': current_user.section_id})
+        users = [dict(row) for row in cursor.fetchall()]
         
     elif notesheet['current_holder'] == current_user.id:
         # Sectional users (section_member) can forward to their section head
         can_forward = True
-        cursor.execute('''
-            SELECT u.user_id, u.full_name, u.designation, s.section_name, u.section_id
-            FROM users u
-            LEFT JOIN sections s ON u.section_id = s.section_id
-            LEFT JOIN user_role_mapping urm ON u.user_id = urm.user_id
-            LEFT JOIN user_roles ur ON urm.role_id = ur.role_id
-            WHERE u.is_active = 1 
-            AND u.section_id = ?
-            AND ur.role_name = 'section_head'
-            AND u.user_id != ?
-            AND u.is_superuser = 0
-            ORDER BY u.full_name
-        ''', (current_user.section_id, current_user.id))
-    
-    users = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    users = [dict(zip(columns, row)) for row in users]
-    
-    # === FINAL DEBUG: Users being sent to template ===
-    print(f"\n>>> FINAL NOTESHEET: Sending {len(users)} users to template")
-    for user in users:
-        print(f"    User ID={user['user_id']}, Name={user['full_name']}, Section={user.get('section_name', 'N/A')}")
-    print(f">>> can_forward={can_forward}")
-    print("=" * 80 + "\n")
+        cursor.execute(SECTION_MEMBER_FORWARD_USERS_SQL,
+                       {'user_id': current_user.id, 'section_id': current_user.section_id})
+        users = [dict(row) for row in cursor.fetchall()]
     
-    db.close()
+    if app.logger.isEnabledFor(logging.DEBUG):
+        app.logger.debug('Notesheet #%s detail: can_forward=%s, %d forwarding users: %s',
+                         notesheet_id, can_forward, len(users),
+                         ', '.join(f"{user['user_id']}={user['full_name']}" for user in users))
     
     return render_template('notesheets/detail.html', 
                          notesheet=notesheet, 
                          movements=movements, 
+                         movement_count=movement_count,
+                         all_movements_url=all_movements_url,
                          users=users,
                          sections=sections,
                          can_forward=can_forward)
@@ -1615,9 +1912,10 @@ def receive_notesheet():
 def forward_notesheet_route(notesheet_id):
     """Forward a notesheet to another user"""
     
-    # Permission check first
-    db = WBSEDCLDatabase()
-    conn = db.connect()
+    # Permission check first, inside the write transaction the forward commits,
+    # so the holder/status it reads cannot change before the movement is added
+    conn = get_db()
+    conn.execute('BEGIN IMMEDIATE')
     cursor = conn.cursor()
     
     # Get notesheet info
@@ -1631,7 +1929,6 @@ def forward_notesheet_route(notesheet_id):
     
     if not notesheet:
         flash('Notesheet not found.', 'error')
-        db.close()
         return redirect(url_for('notesheets_list'))
     
     current_holder, current_status = notesheet
@@ -1646,17 +1943,13 @@ def forward_notesheet_route(notesheet_id):
     
     if not can_forward:
         flash('You do not have permission to forward this document.', 'error')
-        db.close()
         return redirect(url_for('notesheet_detail', notesheet_id=notesheet_id))
     
     # Cannot forward if closed/archived
     if current_status in ['Closed', 'Archived']:
         flash('Cannot forward closed or archived documents.', 'error')
-        db.close()
         return redirect(url_for('notesheet_detail', notesheet_id=notesheet_id))
     
-    db.close()
-    
     # Get form data
     to_user = request.form.get('to_user')
     action = request.form.get('action', 'Forwarded')
@@ -1671,11 +1964,11 @@ def forward_notesheet_route(notesheet_id):
         flash('Please provide forward date.', 'error')
         return redirect(url_for('notesheet_detail', notesheet_id=notesheet_id))
     
-    # Validate forward date
-    from datetime import datetime
+    # Validate forward date; it is stored in the YYYY-MM-DD form the date math expects
     try:
-        forward_date_obj = datetime.strptime(forward_date, '%Y-%m-%d')
-        if forward_date_obj > datetime.now():
+        forward_date_obj = date.fromisoformat(forward_date)
+        forward_date = forward_date_obj.isoformat()
+        if forward_date_obj > date.today():
             flash('Forward date cannot be in the future.', 'error')
             return redirect(url_for('notesheet_detail', notesheet_id=notesheet_id))
     except ValueError:
@@ -1739,86 +2032,76 @@ def park_notesheet_route(notesheet_id):
 @receive_permission_required
 def parked_notesheets():
     """View all parked notesheets"""
-    db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
     
-    cursor.execute('''
+    query = '''
         SELECT 
-            n.*,
+            n.notesheet_id, n.notesheet_number, n.subject, n.sender_name,
+            n.received_date, n.parked_date,
             u.full_name as parked_by_name,
             CAST((julianday('now') - julianday(n.parked_date)) AS INTEGER) as days_parked
         FROM notesheets n
         LEFT JOIN users u ON n.parked_by = u.user_id
         WHERE n.is_parked = 1
-        ORDER BY n.parked_date DESC
-    ''')
+    '''
+    params = []
     
-    parked = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    parked = [dict(zip(columns, row)) for row in parked]
+    after = list_page_cursor()
+    if after:
+        query += ' AND (n.parked_date < ? OR (n.parked_date = ? AND n.notesheet_id > ?))'
+        params.extend([after[0], after[0], after[1]])
     
-    db.close()
+    query += ' ORDER BY n.parked_date DESC, n.notesheet_id LIMIT ?'
+    params.append(LIST_PAGE_SIZE + 1)
+    
+    cursor.execute(query, params)
+    parked, has_more = fetch_page(cursor, LIST_PAGE_SIZE)
+    next_url, first_url = list_page_urls('parked_notesheets', parked, has_more, 'parked_date', 'notesheet_id')
     
-    return render_template('notesheets/parked.html', parked=parked)
+    return render_template('notesheets/parked.html', parked=parked,
+                         next_url=next_url,
+                         first_url=first_url)
 
 # Bill routes
 
 @app.route('/bills')
 @login_required
 def bills_list():
-    """List all bills"""
-    db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
+    """List all bills"""
+    cursor = get_db().cursor()
     
     # Get search and filter parameters
     search = request.args.get('search', '')
     status = request.args.get('status', '')
     
-    # Build query with section info
-    query = '''
-        SELECT 
-            b.bill_id, b.bill_number, b.invoice_number, b.vendor_name,
-            b.bill_amount, b.received_date, b.current_status, b.payment_status, b.priority,
-            u.full_name as current_holder_name,
-            s.section_name as current_section_name
-        FROM bills b
-        LEFT JOIN users u ON b.current_holder = u.user_id
-        LEFT JOIN sections s ON b.current_section_id = s.section_id
-        WHERE 1=1
-    '''
-    params = []
-    
+    # Same matching as Advanced Search keywords (FTS5 index when available)
+    keyword_sql, params = '', []
     if search:
-        query += ' AND (b.bill_number LIKE ? OR b.vendor_name LIKE ? OR b.invoice_number LIKE ?)'
-        search_param = f'%{search}%'
-        params.extend([search_param, search_param, search_param])
+        keyword_sql, params = keyword_condition(SEARCH_TABLE_CONFIG['bills'], search, optional_tables())
     
     if status:
-        query += ' AND b.current_status = ?'
         params.append(status)
     
-    query += ' ORDER BY b.received_date DESC'
+    # Newest first, a page at a time; ties on received_date go by id
+    after = list_page_cursor()
+    if after:
+        params.extend([after[0], after[0], after[1]])
+    params.append(LIST_PAGE_SIZE + 1)
     
+    query = list_sql('bills', keyword_sql, bool(status), bool(after))
     cursor.execute(query, params)
-    bills = cursor.fetchall()
-    
-    # Convert to list of dicts
-    columns = [desc[0] for desc in cursor.description]
-    bills = [dict(zip(columns, row)) for row in bills]
+    bills, has_more = fetch_page(cursor, LIST_PAGE_SIZE)
+    next_url, first_url = list_page_urls('bills_list', bills, has_more, 'received_date', 'bill_id')
     
-    db.close()
-    
-    return render_template('bills/list.html', bills=bills)
+    return render_template('bills/list.html', bills=bills,
+                         next_url=next_url,
+                         first_url=first_url)
 
 @app.route('/bills/<int:bill_id>')
 @login_required
 def bill_detail(bill_id):
     """View bill details"""
-    db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
     
     # Get bill details with section info and time tracking
     cursor.execute('''
@@ -1828,147 +2111,59 @@ def bill_detail(bill_id):
             u2.full_name as received_by_name,
             s.section_name as current_section_name,
             ss.sub_section_name as current_sub_section_name,
-            CAST((julianday('now') - julianday(
-                (SELECT forwarded_date FROM bill_movements 
-                 WHERE bill_id = b.bill_id AND is_current = 1 
-                 ORDER BY forwarded_date DESC LIMIT 1)
-            )) AS INTEGER) as days_held,
-            CAST((julianday('now') - julianday(
-                (SELECT forwarded_date FROM bill_movements 
-                 WHERE bill_id = b.bill_id AND is_current = 1 
-                 ORDER BY forwarded_date DESC LIMIT 1)
-            )) * 24 AS INTEGER) as hours_held
+            CAST(cm.held_days AS INTEGER) as days_held,
+            CAST(cm.held_days * 24 AS INTEGER) as hours_held
         FROM bills b
         LEFT JOIN users u1 ON b.current_holder = u1.user_id
         LEFT JOIN users u2 ON b.received_by = u2.user_id
         LEFT JOIN sections s ON b.current_section_id = s.section_id
         LEFT JOIN sub_sections ss ON b.current_sub_section_id = ss.sub_section_id
+        LEFT JOIN (
+            SELECT bill_id, julianday('now') - julianday(MAX(forwarded_date)) as held_days
+            FROM bill_movements
+            WHERE bill_id = ? AND is_current = 1
+            GROUP BY bill_id
+        ) cm ON cm.bill_id = b.bill_id
         WHERE b.bill_id = ?
-    ''', (bill_id,))
+    ''', (bill_id, bill_id))
     
     bill = cursor.fetchone()
     
     if not bill:
-        db.close()
         flash('Bill not found.', 'error')
         return redirect(url_for('bills_list'))
     
     # Convert to dict
-    columns = [desc[0] for desc in cursor.description]
-    bill = dict(zip(columns, bill))
+    bill = dict(bill)
     
     # Get movement history with section info (newest first - DESC)
     cursor.execute('''
         SELECT 
             bm.*,
-            u1.full_name as from_user_name,
-            u2.full_name as to_user_name,
-            u3.full_name as forwarded_by_name,
-            s1.section_name as from_section_name,
-            s2.section_name as to_section_name,
-            DATE(bm.forwarded_date) as forward_date_only
+            DATE(bm.forwarded_date) as forward_date_only,
+            LAG(DATE(bm.forwarded_date)) OVER w as next_date_only,
+            CAST(julianday(CASE WHEN ROW_NUMBER() OVER w = 1 THEN :today
+                                ELSE LAG(DATE(bm.forwarded_date)) OVER w END)
+                 - julianday(DATE(bm.forwarded_date)) AS INTEGER) as days_held
         FROM bill_movements bm
-        LEFT JOIN users u1 ON bm.from_user = u1.user_id
-        LEFT JOIN users u2 ON bm.to_user = u2.user_id
-        LEFT JOIN users u3 ON bm.forwarded_by = u3.user_id
-        LEFT JOIN sections s1 ON bm.from_section_id = s1.section_id
-        LEFT JOIN sections s2 ON bm.to_section_id = s2.section_id
-        WHERE bm.bill_id = ?
+        WHERE bm.bill_id = :bill_id
+        WINDOW w AS (ORDER BY bm.movement_id DESC)
         ORDER BY bm.movement_id DESC
-    ''', (bill_id,))
-    
-    movements = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    movements = [dict(zip(columns, row)) for row in movements]
-    
-    # Calculate days held - CORRECTED
-    # movements[0] = newest (current), movements[-1] = oldest (initial receipt)
-    from datetime import datetime as dt
-    for i, movement in enumerate(movements):
-        movement['display_date'] = movement['forward_date_only']
-        
-        if i == 0:
-            # Current/newest location - still here
-            try:
-                in_date = dt.strptime(movement['forward_date_only'], '%Y-%m-%d').date()
-                today = dt.now().date()
-                days_diff = (today - in_date).days
-                
-                movement['in_date'] = movement['forward_date_only']
-                movement['out_date'] = 'Present'
-                
-                if days_diff == 0:
-                    movement['time_held'] = "Today (current)"
-                elif days_diff == 1:
-                    movement['time_held'] = "1 day (current)"
-                else:
-                    movement['time_held'] = f"{days_diff} days (current)"
-            except:
-                movement['time_held'] = "Unknown (current)"
-        elif i == len(movements) - 1:
-            # Oldest movement (initial receipt) - always calculate OUT to next movement
-            movement['in_date'] = movement['forward_date_only']
-            if len(movements) > 1:
-                # There IS a next movement - calculate OUT date
-                try:
-                    in_date_str = movement['forward_date_only']
-                    out_date_str = movements[i-1]['forward_date_only']
-                    
-                    # Handle None values
-                    if not in_date_str or not out_date_str:
-                        movement['out_date'] = 'N/A'
-                        movement['time_held'] = "Missing date"
-                    else:
-                        in_date = dt.strptime(str(in_date_str), '%Y-%m-%d').date()
-                        out_date = dt.strptime(str(out_date_str), '%Y-%m-%d').date()
-                        days_diff = (out_date - in_date).days
-                        
-                        movement['out_date'] = out_date_str
-                        
-                        if days_diff < 0:
-                            movement['time_held'] = f"{abs(days_diff)} days (ERROR: OUT before IN)"
-                        elif days_diff == 0:
-                            movement['time_held'] = "Same day"
-                        elif days_diff == 1:
-                            movement['time_held'] = "1 day"
-                        else:
-                            movement['time_held'] = f"{days_diff} days"
-                except Exception as e:
-                    # Even on error, set OUT date if available
-                    if i > 0 and movements[i-1].get('forward_date_only'):
-                        movement['out_date'] = movements[i-1]['forward_date_only']
-                    else:
-                        movement['out_date'] = 'N/A'
-                    movement['time_held'] = f"Error: {str(e)[:30]}"
-            else:
-                # Only one movement - still at initial receipt
-                movement['out_date'] = 'Present'
-                movement['time_held'] = "Still here (current)"
-        else:
-            # Middle movements - calculate time from IN to next movement
-            try:
-                in_date = dt.strptime(movement['forward_date_only'], '%Y-%m-%d').date()
-                out_date = dt.strptime(movements[i-1]['forward_date_only'], '%Y-%m-%d').date()
-                days_diff = (out_date - in_date).days
-                
-                movement['in_date'] = movement['forward_date_only']
-                movement['out_date'] = movements[i-1]['forward_date_only']
-                
-                if days_diff < 0:
-                    # Negative days - data issue, don't show OUT
-                    movement['out_date'] = 'N/A'
-                    movement['time_held'] = "Data error"
-                elif days_diff == 0:
-                    movement['time_held'] = "Same day"
-                elif days_diff == 1:
-                    movement['time_held'] = "1 day"
-                else:
-                    movement['time_held'] = f"{days_diff} days"
-            except:
-                movement['time_held'] = "Unknown"
+        LIMIT :limit
+    ''', {'bill_id': bill_id, 'today': datetime.now().date().isoformat(), 'limit': movements_limit()})
+    
+    # Days held were worked out in SQL; add the IN/OUT/time-held labels.
+    # Long histories show the latest page, with a link to the full list
+    movements, more_movements = fetch_movements(cursor)
+    movement_count = len(movements)
+    all_movements_url = None
+    if more_movements:
+        cursor.execute('SELECT COUNT(*) FROM bill_movements WHERE bill_id = ?', (bill_id,))
+        movement_count = cursor.fetchone()[0]
+        all_movements_url = url_for('bill_detail', bill_id=bill_id, all=1)
     
     # Get sections for forwarding dropdown
-    sections = db.get_all_sections()
+    sections = get_sections()
     
     # Determine who can forward based on role
     can_forward = False
@@ -1981,15 +2176,7 @@ def bill_detail(bill_id):
         # Receive section can ALWAYS forward to any section, regardless of current holder
         # Exclude current holder and superusers from list
         can_forward = True
-        cursor.execute('''
-            SELECT u.user_id, u.full_name, u.designation, s.section_name, u.section_id
-            FROM users u
-            LEFT JOIN sections s ON u.section_id = s.section_id
-            WHERE u.is_active = 1 
-            AND u.user_id != ?
-            AND u.is_superuser = 0
-            ORDER BY s.section_name, u.full_name
-        ''', (current_holder_id,))
+        users = [user for user in get_forward_targets() if user['user_id'] != current_holder_id]
         
     elif current_user.is_section_head() and bill['current_holder'] == current_user.id:
         # Section heads can forward if they are the current holder
@@ -1999,78 +2186,36 @@ def bill_detail(bill_id):
         # 3. Receive section users
         can_forward = True
         
-        print(f"DEBUG BILL: User ID={current_user.id}, Section ID={current_user.section_id}")
-        
-        cursor.execute('''
-            SELECT DISTINCT u.user_id, u.full_name, u.designation, s.section_name, u.section_id
-            FROM users u
-            LEFT JOIN sections s ON u.section_id = s.section_id
-            LEFT JOIN user_role_mapping urm ON u.user_id = urm.user_id
-            LEFT JOIN user_roles ur ON urm.role_id = ur.role_id
-            WHERE u.is_active = 1 
-            AND u.user_id != ?
-            AND u.is_superuser = 0
-            AND (
-                u.section_id = ?
-                OR ur.role_name = 'section_head'
-                OR ur.role_name = 'receive_section'
-            )
-            ORDER BY s.section_name, u.full_name
-        ''', (current_user.id, current_user.section_id))
-        
-        test_users = cursor.fetchall()
-        print(f"DEBUG BILL: Query returned {len(test_users)} users")
-        for usr in test_users:
-            print(f"DEBUG BILL:   {usr}")
+        app.logger.debug('Bill #%s forward list: user=%s section=%s',
+                         bill_id, current_user.id, current_user.section_id)
         
-        # Reset cursor for actual use
-        cursor.execute('''
-            SELECT DISTINCT u.user_id, u.full_name, u.designation, s.section_name, u.section_id
-            FROM users u
-            LEFT JOIN sections s ON u.section_id = s.section_id
-            LEFT JOIN user_role_mapping urm ON u.user_id = urm.user_id
-            LEFT JOIN user_roles ur ON urm.role_id = ur.role_id
-            WHERE u.is_active = 1 
-            AND u.user_id != ?
-            AND u.is_superuser = 0
-            AND (
-                u.section_id = ?
-                OR ur.role_name = 'section_head'
-                OR ur.role_name = 'receive_section'
-            )
-            ORDER BY s.section_name, u.full_name
-        ''', (current_user.id, current_user.section_id))
+        cursor.execute(SECTION_HEAD_FORWARD_USERS_SQL,
+                       {'user_id': current_user.id, 'section_id': current_user.section_id})
+        users = [dict(row) for row in cursor.fetchall()]
         
     elif bill['current_holder'] == current_user.id:
         # Sectional users (section_member) can forward to their section head
         can_forward = True
-        cursor.execute('''
-            SELECT u.user_id, u.full_name, u.designation, s.section_name, u.section_id
-            FROM users u
-            LEFT JOIN sections s ON u.section_id = s.section_id
-            LEFT JOIN user_role_mapping urm ON u.user_id = urm.user_id
-            LEFT JOIN user_roles ur ON urm.role_id = ur.role_id
-            WHERE u.is_active = 1 
-            AND u.section_id = ?
-            AND ur.role_name = 'section_head'
-            AND u.user_id != ?
-            AND u.is_superuser = 0
-            ORDER BY u.full_name
-        ''', (current_user.section_id, current_user.id))
-    
-    users = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    users = [dict(zip(columns, row)) for row in users]
-    
-    db.close()
+        cursor.execute(SECTION_MEMBER_FORWARD_USERS_SQL,
+                       {'user_id': current_user.id, 'section_id': current_user.section_id})
+        users = [dict(row) for row in cursor.fetchall()]
     
     return render_template('bills/detail.html', 
                          bill=bill, 
                          movements=movements, 
+                         movement_count=movement_count,
+                         all_movements_url=all_movements_url,
                          users=users,
                          sections=sections,
                          can_forward=can_forward)
 
+# Receive Bill form fields copied as entered, and the amount fields read as floats
+BILL_TEXT_FIELDS = ('bill_number', 'invoice_number', 'vendor_name', 'vendor_address',
+                    'vendor_gstin', 'vendor_pan', 'bill_date', 'received_date',
+                    'bill_type', 'category', 'description', 'remarks')
+BILL_AMOUNT_FIELDS = ('bill_amount', 'taxable_amount', 'gst_amount', 'tds_amount',
+                      'net_payable_amount')
+
 @app.route('/bills/receive', methods=['GET', 'POST'])
 @login_required
 @receive_permission_required
@@ -2079,28 +2224,17 @@ def receive_bill():
     if request.method == 'POST':
         db = WBSEDCLDatabase()
         
-        bill_data = {
-            'bill_number': request.form.get('bill_number'),
-            'invoice_number': request.form.get('invoice_number'),
-            'vendor_name': request.form.get('vendor_name'),
-            'vendor_address': request.form.get('vendor_address'),
-            'vendor_gstin': request.form.get('vendor_gstin'),
-            'vendor_pan': request.form.get('vendor_pan'),
-            'bill_date': request.form.get('bill_date'),
-            'received_date': request.form.get('received_date'),
-            'bill_amount': float(request.form.get('bill_amount') or 0) if request.form.get('bill_amount') else 0.0,
-            'taxable_amount': float(request.form.get('taxable_amount') or 0) if request.form.get('taxable_amount') else None,
-            'gst_amount': float(request.form.get('gst_amount') or 0) if request.form.get('gst_amount') else None,
-            'tds_amount': float(request.form.get('tds_amount') or 0) if request.form.get('tds_amount') else None,
-            'net_payable_amount': float(request.form.get('net_payable_amount') or 0) if request.form.get('net_payable_amount') else None,
-            'bill_type': request.form.get('bill_type'),
-            'category': request.form.get('category'),
-            'priority': request.form.get('priority', 'Normal'),
-            'description': request.form.get('description'),
-            'remarks': request.form.get('remarks'),
+        form = request.form
+        bill_data = {field: form.get(field) for field in BILL_TEXT_FIELDS}
+        # Blank amounts: bill_amount defaults to 0, the breakdown ones stay NULL
+        for field in BILL_AMOUNT_FIELDS:
+            value = form.get(field)
+            bill_data[field] = float(value) if value else (0.0 if field == 'bill_amount' else None)
+        bill_data.update({
+            'priority': form.get('priority', 'Normal'),
             'received_by': current_user.id,
             'current_section_id': current_user.section_id or 1
-        }
+        })
         
         bill_id = db.create_bill(bill_data)
         
@@ -2123,9 +2257,10 @@ def receive_bill():
 def forward_bill_route(bill_id):
     """Forward a bill to another user"""
     
-    # Permission check first
-    db = WBSEDCLDatabase()
-    conn = db.connect()
+    # Permission check first, inside the write transaction the forward commits,
+    # so the holder/status it reads cannot change before the movement is added
+    conn = get_db()
+    conn.execute('BEGIN IMMEDIATE')
     cursor = conn.cursor()
     
     # Get bill info
@@ -2139,7 +2274,6 @@ def forward_bill_route(bill_id):
     
     if not bill:
         flash('Bill not found.', 'error')
-        db.close()
         return redirect(url_for('bills_list'))
     
     current_holder, current_status, payment_status = bill
@@ -2154,17 +2288,13 @@ def forward_bill_route(bill_id):
     
     if not can_forward:
         flash('You do not have permission to forward this document.', 'error')
-        db.close()
         return redirect(url_for('bill_detail', bill_id=bill_id))
     
     # Cannot forward if closed/archived/paid
     if current_status in ['Closed', 'Archived'] or payment_status == 'Paid':
         flash('Cannot forward closed, archived, or paid bills.', 'error')
-        db.close()
         return redirect(url_for('bill_detail', bill_id=bill_id))
     
-    db.close()
-    
     # Get form data
     to_user = request.form.get('to_user')
     action = request.form.get('action', 'Forwarded')
@@ -2179,11 +2309,11 @@ def forward_bill_route(bill_id):
         flash('Please provide forward date.', 'error')
         return redirect(url_for('bill_detail', bill_id=bill_id))
     
-    # Validate forward date
-    from datetime import datetime
+    # Validate forward date; it is stored in the YYYY-MM-DD form the date math expects
     try:
-        forward_date_obj = datetime.strptime(forward_date, '%Y-%m-%d')
-        if forward_date_obj > datetime.now():
+        forward_date_obj = date.fromisoformat(forward_date)
+        forward_date = forward_date_obj.isoformat()
+        if forward_date_obj > date.today():
             flash('Forward date cannot be in the future.', 'error')
             return redirect(url_for('bill_detail', bill_id=bill_id))
     except ValueError:
@@ -2228,61 +2358,40 @@ def forward_bill_route(bill_id):
 @login_required
 def letters_list():
     """List all letters"""
-    db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
-    
     # Get search and filter parameters
     search = request.args.get('search', '')
     status = request.args.get('status', '')
     
-    # Build query with section info
-    query = '''
-        SELECT 
-            l.letter_id, l.letter_number, l.subject, l.sender_name,
-            l.received_date, l.current_status, l.priority, l.is_parked,
-            l.letter_type, l.reply_required,
-            u.full_name as current_holder_name,
-            s.section_name as current_section_name
-        FROM letters l
-        LEFT JOIN users u ON l.current_holder = u.user_id
-        LEFT JOIN sections s ON l.current_section_id = s.section_id
-        WHERE 1=1
-    '''
-    params = []
-    
+    # Same matching as Advanced Search keywords (FTS5 index when available)
+    keyword_sql, params = '', []
     if search:
-        query += ' AND (l.letter_number LIKE ? OR l.subject LIKE ? OR l.sender_name LIKE ?)'
-        search_param = f'%{search}%'
-        params.extend([search_param, search_param, search_param])
+        keyword_sql, params = keyword_condition(SEARCH_TABLE_CONFIG['letters'], search, optional_tables())
     
     if status:
-        query += ' AND l.current_status = ?'
         params.append(status)
     
-    query += ' ORDER BY l.received_date DESC'
-    
-    cursor.execute(query, params)
-    letters = cursor.fetchall()
-    
-    # Convert to list of dicts
-    columns = [desc[0] for desc in cursor.description]
-    letters = [dict(zip(columns, row)) for row in letters]
-    
-    db.close()
-    
-    return render_template('letters/list.html', letters=letters)
+    # Newest first, a page at a time; ties on received_date go by id
+    after = list_page_cursor()
+    if after:
+        params.extend([after[0], after[0], after[1]])
+    params.append(LIST_PAGE_SIZE + 1)
+    
+    query = list_sql('letters', keyword_sql, bool(status), bool(after))
+    letters = cached_letter_rows(('letters', search, status, after), query, tuple(params))
+    has_more = len(letters) > LIST_PAGE_SIZE
+    letters = letters[:LIST_PAGE_SIZE]
+    next_url, first_url = list_page_urls('letters_list', letters, has_more, 'received_date', 'letter_id')
+    
+    return render_template('letters/list.html', letters=letters,
+                         next_url=next_url,
+                         first_url=first_url)
 
 @app.route('/my-letters')
 @login_required
 def my_letters():
     """Show letters assigned to current user"""
-    db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
-    
     # Get letters where current user is the holder
-    cursor.execute('''
+    letters = cached_letter_rows(('my', current_user.id), '''
         SELECT 
             l.letter_id, l.letter_number, l.subject, l.sender_name,
             l.received_date, l.current_status, l.priority, l.is_parked,
@@ -2296,23 +2405,13 @@ def my_letters():
         ORDER BY l.received_date DESC
     ''', (current_user.id,))
     
-    letters = cursor.fetchall()
-    
-    # Convert to list of dicts
-    columns = [desc[0] for desc in cursor.description]
-    letters = [dict(zip(columns, row)) for row in letters]
-    
-    db.close()
-    
     return render_template('letters/list.html', letters=letters, filter_type='my')
 
 @app.route('/letters/<int:letter_id>')
 @login_required
 def letter_detail(letter_id):
     """View letter details"""
-    db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
     
     # Get letter details with section info (WITHOUT days_held calculation)
     cursor.execute('''
@@ -2333,131 +2432,96 @@ def letter_detail(letter_id):
     letter = cursor.fetchone()
     
     if not letter:
-        db.close()
         flash('Letter not found.', 'error')
         return redirect(url_for('letters_list'))
     
     # Convert to dict
-    columns = [desc[0] for desc in cursor.description]
-    letter_dict = dict(zip(columns, letter))
-    
-    # CORRECTED: Calculate days held from CURRENT MOVEMENT, not received date
-    cursor.execute('''
-        SELECT forwarded_date
-        FROM letter_movements
-        WHERE letter_id = ? AND is_current = 1
-        ORDER BY movement_id DESC
-        LIMIT 1
-    ''', (letter_id,))
-    
-    current_movement = cursor.fetchone()
-    
-    if current_movement and current_movement[0]:
-        # Use the IN date from current movement
-        from datetime import datetime
-        in_date = datetime.strptime(current_movement[0], '%Y-%m-%d')
-        now = datetime.now()
-        days_held = (now - in_date).days
-        letter_dict['days_held'] = days_held
-    else:
-        # Fallback to received date if no movement
-        from datetime import datetime
-        received_date = datetime.strptime(letter_dict['received_date'], '%Y-%m-%d')
-        now = datetime.now()
-        days_held = (now - received_date).days
-        letter_dict['days_held'] = days_held
+    letter_dict = dict(letter)
     
-    # Get movement history (newest first - DESC)
+    # Get movement history (newest first - DESC); user and section names come
+    # from the cached maps, as for notesheet and bill movements
     cursor.execute('''
-        SELECT 
-            lm.*,
-            u1.full_name as from_user_name,
-            u2.full_name as to_user_name,
-            u3.full_name as forwarded_by_name,
-            s1.section_name as from_section_name,
-            s2.section_name as to_section_name,
-            DATE(lm.forwarded_date) as forward_date_only
+        SELECT lm.*, DATE(lm.forwarded_date) as forward_date_only
         FROM letter_movements lm
-        LEFT JOIN users u1 ON lm.from_user = u1.user_id
-        LEFT JOIN users u2 ON lm.to_user = u2.user_id
-        LEFT JOIN users u3 ON lm.forwarded_by = u3.user_id
-        LEFT JOIN sections s1 ON lm.from_section_id = s1.section_id
-        LEFT JOIN sections s2 ON lm.to_section_id = s2.section_id
         WHERE lm.letter_id = ?
         ORDER BY lm.movement_id DESC
     ''', (letter_id,))
     
-    movements = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    movements = [dict(zip(columns, row)) for row in movements]
-    
-    # Calculate days held for each movement
-    from datetime import datetime as dt
+    user_names = get_user_names()
+    section_names = get_section_names()
+    movements = []
+    for row in cursor.fetchall():
+        movement = dict(row)
+        movement['from_user_name'] = user_names.get(movement['from_user'])
+        movement['to_user_name'] = user_names.get(movement['to_user'])
+        movement['forwarded_by_name'] = user_names.get(movement['forwarded_by'])
+        movement['from_section_name'] = section_names.get(movement['from_section_id'])
+        movement['to_section_name'] = section_names.get(movement['to_section_id'])
+        movements.append(movement)
+    
+    # CORRECTED: Calculate days held from CURRENT MOVEMENT, not received date.
+    # The history is newest first, so the first current row is the one to use
+    current_movement = next((m for m in movements if m['is_current']), None)
+    now = datetime.now()
+    if current_movement and current_movement['forwarded_date']:
+        # Use the IN date from current movement
+        in_date = datetime.fromisoformat(current_movement['forwarded_date'])
+        letter_dict['days_held'] = (now - in_date).days
+    else:
+        # Fallback to received date if no movement
+        received_date = datetime.fromisoformat(letter_dict['received_date'])
+        letter_dict['days_held'] = (now - received_date).days
+    
+    # Calculate days held for each movement. DATE() gives ISO dates or NULL,
+    # so a missing date is the only case to handle; each is parsed once
+    dates = [date.fromisoformat(m['forward_date_only']) if m['forward_date_only'] else None
+             for m in movements]
+    today = now.date()
     for i, movement in enumerate(movements):
         movement['display_date'] = movement['forward_date_only']
+        in_date = dates[i]
         
         if i == 0:
             # Current location - still here
-            try:
-                in_date = dt.strptime(movement['forward_date_only'], '%Y-%m-%d').date()
-                today = dt.now().date()
-                days_diff = (today - in_date).days
-                
-                movement['in_date'] = movement['forward_date_only']
-                movement['out_date'] = 'Present'
-                
-                if days_diff == 0:
-                    movement['time_held'] = "Today (current)"
-                elif days_diff == 1:
-                    movement['time_held'] = "1 day (current)"
-                else:
-                    movement['time_held'] = f"{days_diff} days (current)"
-            except:
+            if in_date is None:
                 movement['time_held'] = "Unknown (current)"
+                continue
+            days_diff = (today - in_date).days
+            
+            movement['in_date'] = movement['forward_date_only']
+            movement['out_date'] = 'Present'
+            
+            if days_diff == 0:
+                movement['time_held'] = "Today (current)"
+            else:
+                movement['time_held'] = days_held_text(days_diff) + " (current)"
         elif i == len(movements) - 1:
             # Oldest movement
             movement['in_date'] = movement['forward_date_only']
             if len(movements) > 1:
-                try:
-                    in_date = dt.strptime(movement['forward_date_only'], '%Y-%m-%d').date()
-                    out_date = dt.strptime(movements[i-1]['forward_date_only'], '%Y-%m-%d').date()
-                    days_diff = (out_date - in_date).days
-                    
-                    movement['out_date'] = movements[i-1]['forward_date_only']
-                    
-                    if days_diff == 0:
-                        movement['time_held'] = "Same day"
-                    elif days_diff == 1:
-                        movement['time_held'] = "1 day"
-                    else:
-                        movement['time_held'] = f"{days_diff} days"
-                except:
+                out_date = dates[i-1]
+                if in_date is None or out_date is None:
                     movement['out_date'] = 'N/A'
                     movement['time_held'] = "Error"
+                else:
+                    movement['out_date'] = movements[i-1]['forward_date_only']
+                    movement['time_held'] = days_held_text((out_date - in_date).days)
             else:
                 movement['out_date'] = 'Present'
                 movement['time_held'] = "Still here (current)"
         else:
             # Middle movements
-            try:
-                in_date = dt.strptime(movement['forward_date_only'], '%Y-%m-%d').date()
-                out_date = dt.strptime(movements[i-1]['forward_date_only'], '%Y-%m-%d').date()
-                days_diff = (out_date - in_date).days
-                
-                movement['in_date'] = movement['forward_date_only']
-                movement['out_date'] = movements[i-1]['forward_date_only']
-                
-                if days_diff == 0:
-                    movement['time_held'] = "Same day"
-                elif days_diff == 1:
-                    movement['time_held'] = "1 day"
-                else:
-                    movement['time_held'] = f"{days_diff} days"
-            except:
+            out_date = dates[i-1]
+            if in_date is None or out_date is None:
                 movement['time_held'] = "Unknown"
+                continue
+            
+            movement['in_date'] = movement['forward_date_only']
+            movement['out_date'] = movements[i-1]['forward_date_only']
+            movement['time_held'] = days_held_text((out_date - in_date).days)
     
     # Get sections for forwarding dropdown
-    sections = db.get_all_sections()
+    sections = get_sections()
     
     # Determine who can forward based on role
     can_forward = False
@@ -2468,58 +2532,21 @@ def letter_detail(letter_id):
     if current_user.is_receive_section():
         # Receive section can always forward
         can_forward = True
-        cursor.execute('''
-            SELECT u.user_id, u.full_name, u.designation, s.section_name, u.section_id
-            FROM users u
-            LEFT JOIN sections s ON u.section_id = s.section_id
-            WHERE u.is_active = 1 
-            AND u.user_id != ?
-            AND u.is_superuser = 0
-            ORDER BY s.section_name, u.full_name
-        ''', (current_holder_id,))
+        users = [user for user in get_forward_targets() if user['user_id'] != current_holder_id]
         
     elif current_user.is_section_head() and letter_dict['current_holder'] == current_user.id:
         # Section heads can forward if they are the current holder
         can_forward = True
-        cursor.execute('''
-            SELECT DISTINCT u.user_id, u.full_name, u.designation, s.section_name, u.section_id
-            FROM users u
-            LEFT JOIN sections s ON u.section_id = s.section_id
-            LEFT JOIN user_role_mapping urm ON u.user_id = urm.user_id
-            LEFT JOIN user_roles ur ON urm.role_id = ur.role_id
-            WHERE u.is_active = 1 
-            AND u.user_id != ?
-            AND u.is_superuser = 0
-            AND (
-                u.section_id = ?
-                OR ur.role_name = 'section_head'
-                OR ur.role_name = 'receive_section'
-            )
-            ORDER BY s.section_name, u.full_name
-        ''', (current_user.id, current_user.section_id))
+        cursor.execute(SECTION_HEAD_FORWARD_USERS_SQL,
+                       {'user_id': current_user.id, 'section_id': current_user.section_id})
+        users = [dict(row) for row in cursor.fetchall()]
         
     elif letter_dict['current_holder'] == current_user.id:
         # Sectional users can forward to their section head
         can_forward = True
-        cursor.execute('''
-            SELECT u.user_id, u.full_name, u.designation, s.section_name, u.section_id
-            FROM users u
-            LEFT JOIN sections s ON u.section_id = s.section_id
-            LEFT JOIN user_role_mapping urm ON u.user_id = urm.user_id
-            LEFT JOIN user_roles ur ON urm.role_id = ur.role_id
-            WHERE u.is_active = 1 
-            AND u.section_id = ?
-            AND ur.role_name = 'section_head'
-            AND u.user_id != ?
-            AND u.is_superuser = 0
-            ORDER BY u.full_name
-        ''', (current_user.section_id, current_user.id))
-    
-    users = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    users = [dict(zip(columns, row)) for row in users]
-    
-    db.close()
+        cursor.execute(SECTION_MEMBER_FORWARD_USERS_SQL,
+                       {'user_id': current_user.id, 'section_id': current_user.section_id})
+        users = [dict(row) for row in cursor.fetchall()]
     
     return render_template('letters/detail.html', 
                          letter=letter_dict, 
@@ -2563,7 +2590,7 @@ def receive_letter():
                 'current_section_id': current_user.section_id or 1
             }
             
-            # Insert letter
+            # Insert letter, getting its id back from the same statement
             cursor.execute('''
                 INSERT INTO letters (
                     letter_number, subject, sender_name, sender_organization,
@@ -2572,6 +2599,7 @@ def receive_letter():
                     reply_required, reply_deadline, remarks, received_by,
                     current_section_id, current_holder
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                RETURNING letter_id
             ''', (
                 letter_data['letter_number'], letter_data['subject'], letter_data['sender_name'],
                 letter_data['sender_organization'], letter_data['sender_address'],
@@ -2584,7 +2612,7 @@ def receive_letter():
                 current_user.id
             ))
             
-            letter_id = cursor.lastrowid
+            letter_id = cursor.fetchone()[0]
             
             # Create initial movement (received by current user)
             cursor.execute('''
@@ -2632,9 +2660,10 @@ def receive_letter():
 def forward_letter_route(letter_id):
     """Forward a letter to another user"""
     
-    # Permission check first
-    db = WBSEDCLDatabase()
-    conn = db.connect()
+    # Permission check first, inside the write transaction the forward commits,
+    # so the holder/status it reads cannot change before the movement is added
+    conn = get_db()
+    conn.execute('BEGIN IMMEDIATE')
     cursor = conn.cursor()
     
     # Get letter info
@@ -2648,7 +2677,6 @@ def forward_letter_route(letter_id):
     
     if not letter:
         flash('Letter not found.', 'error')
-        db.close()
         return redirect(url_for('letters_list'))
     
     current_holder, current_status = letter
@@ -2663,17 +2691,13 @@ def forward_letter_route(letter_id):
     
     if not can_forward:
         flash('You do not have permission to forward this document.', 'error')
-        db.close()
         return redirect(url_for('letter_detail', letter_id=letter_id))
     
     # Cannot forward if closed/archived/replied
     if current_status in ['Closed', 'Archived', 'Replied']:
         flash('Cannot forward closed, archived, or replied letters.', 'error')
-        db.close()
         return redirect(url_for('letter_detail', letter_id=letter_id))
     
-    db.close()
-    
     # Get form data
     to_user = request.form.get('to_user')
     action = request.form.get('action', 'Forwarded')
@@ -2688,28 +2712,22 @@ def forward_letter_route(letter_id):
         flash('Please provide forward date.', 'error')
         return redirect(url_for('letter_detail', letter_id=letter_id))
     
-    # Validate forward date
-    from datetime import datetime
+    # Validate forward date; it is stored in the YYYY-MM-DD form the date math expects
     try:
-        forward_date_obj = datetime.strptime(forward_date, '%Y-%m-%d')
-        if forward_date_obj > datetime.now():
+        forward_date_obj = date.fromisoformat(forward_date)
+        forward_date = forward_date_obj.isoformat()
+        if forward_date_obj > date.today():
             flash('Forward date cannot be in the future.', 'error')
             return redirect(url_for('letter_detail', letter_id=letter_id))
     except ValueError:
         flash('Invalid date format.', 'error')
         return redirect(url_for('letter_detail', letter_id=letter_id))
     
-    # Forward letter (direct SQL since there might not be a db.forward_letter method)
+    # Forward letter (direct SQL since there might not be a db.forward_letter method),
+    # in the transaction opened above; to_user's section is looked up inline
     db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
     
     try:
-        # Get to_user section
-        cursor.execute('SELECT section_id FROM users WHERE user_id = ?', (to_user,))
-        to_section_result = cursor.fetchone()
-        to_section_id = to_section_result[0] if to_section_result else None
-        
         # Set previous movements to not current (NO out_date)
         cursor.execute('''
             UPDATE letter_movements 
@@ -2722,9 +2740,9 @@ def forward_letter_route(letter_id):
             INSERT INTO letter_movements (
                 letter_id, from_user, to_user, from_section_id, to_section_id,
                 forwarded_by, forwarded_date, action_taken, comments, is_current
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+            ) VALUES (?, ?, ?, ?, (SELECT section_id FROM users WHERE user_id = ?), ?, ?, ?, ?, 1)
         ''', (
-            letter_id, current_holder, int(to_user), current_user.section_id, to_section_id,
+            letter_id, current_holder, int(to_user), current_user.section_id, int(to_user),
             current_user.id, forward_date, action, comments
         ))
         
@@ -2732,10 +2750,10 @@ def forward_letter_route(letter_id):
         cursor.execute('''
             UPDATE letters SET 
                 current_holder = ?,
-                current_section_id = ?,
+                current_section_id = (SELECT section_id FROM users WHERE user_id = ?),
                 updated_at = CURRENT_TIMESTAMP
             WHERE letter_id = ?
-        ''', (int(to_user), to_section_id, letter_id))
+        ''', (int(to_user), int(to_user), letter_id))
         
         conn.commit()
         
@@ -2806,26 +2824,23 @@ def park_letter_route(letter_id):
 @receive_permission_required
 def parked_letters():
     """View all parked letters"""
-    db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
+    rows = cached_letter_rows(('parked',), '''
         SELECT 
-            l.*,
-            u.full_name as parked_by_name,
-            CAST((julianday('now') - julianday(l.parked_date)) AS INTEGER) as days_parked
+            l.letter_id, l.letter_number, l.subject, l.sender_name, l.priority,
+            l.parked_date, l.parked_reason,
+            u.full_name as parked_by_name
         FROM letters l
         LEFT JOIN users u ON l.parked_by = u.user_id
         WHERE l.is_parked = 1
         ORDER BY l.parked_date DESC
     ''')
     
-    parked = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    parked = [dict(zip(columns, row)) for row in parked]
-    
-    db.close()
+    # Days parked are counted here rather than in the query, so cached rows
+    # still count up to now (parked_date is CURRENT_TIMESTAMP, i.e. UTC)
+    now = datetime.utcnow()
+    parked = [dict(row, days_parked=(now - datetime.fromisoformat(row['parked_date'])).days
+                   if row['parked_date'] else None)
+              for row in rows]
     
     return render_template('letters/parked.html', parked=parked)
 
@@ -2889,13 +2904,13 @@ def edit_letter(letter_id):
             
             flash('Letter updated successfully!', 'success')
             db.close()
-            return redirect(url_for('letter_detail', letter_id=letter_id))
+            return see_other(url_for('letter_detail', letter_id=letter_id))
             
         except Exception as e:
             conn.rollback()
             db.close()
             flash(f'Error updating letter: {str(e)}', 'error')
-            return redirect(url_for('edit_letter', letter_id=letter_id))
+            return see_other(url_for('edit_letter', letter_id=letter_id))
     
     # GET - show form
     cursor.execute('SELECT * FROM letters WHERE letter_id = ?', (letter_id,))
@@ -2906,8 +2921,7 @@ def edit_letter(letter_id):
         flash('Letter not found.', 'error')
         return redirect(url_for('letters_list'))
     
-    columns = [desc[0] for desc in cursor.description]
-    letter = dict(zip(columns, letter))
+    letter = dict(letter)
     
     db.close()
     return render_template('letters/edit.html', letter=letter)
@@ -2923,20 +2937,20 @@ def edit_letter_movement(movement_id):
     
     if request.method == 'POST':
         try:
+            # Update and fetch the parent letter for the redirect in one statement
             cursor.execute('''
                 UPDATE letter_movements SET
                     forwarded_date = ?,
                     comments = ?
                 WHERE movement_id = ?
+                RETURNING letter_id
             ''', (
                 request.form.get('forwarded_date'),
                 request.form.get('comments'),
                 movement_id
             ))
-            conn.commit()
-            
-            cursor.execute('SELECT letter_id FROM letter_movements WHERE movement_id = ?', (movement_id,))
             letter_id = cursor.fetchone()[0]
+            conn.commit()
             
             db.log_activity(current_user.id, 'movement_edited',
                            f"Edited letter movement ID {movement_id}",
@@ -2944,7 +2958,7 @@ def edit_letter_movement(movement_id):
             
             flash('Movement updated successfully!', 'success')
             db.close()
-            return redirect(url_for('letter_detail', letter_id=letter_id))
+            return see_other(url_for('letter_detail', letter_id=letter_id))
             
         except Exception as e:
             conn.rollback()
@@ -2965,8 +2979,7 @@ def edit_letter_movement(movement_id):
         flash('Movement not found.', 'error')
         return redirect(url_for('letters_list'))
     
-    columns = [desc[0] for desc in cursor.description]
-    movement = dict(zip(columns, movement))
+    movement = dict(movement)
     
     db.close()
     return render_template('letters/edit_movement.html', movement=movement)
@@ -2988,7 +3001,7 @@ def delete_letter_movement(movement_id):
         if not result:
             db.close()
             flash('Movement not found.', 'error')
-            return redirect(url_for('letters_list'))
+            return see_other(url_for('letters_list'))
         
         letter_id = result[0]
         
@@ -3002,13 +3015,13 @@ def delete_letter_movement(movement_id):
         
         flash('Movement deleted successfully!', 'success')
         db.close()
-        return redirect(url_for('letter_detail', letter_id=letter_id))
+        return see_other(url_for('letter_detail', letter_id=letter_id))
         
     except Exception as e:
         conn.rollback()
         db.close()
         flash(f'Error deleting movement: {str(e)}', 'error')
-        return redirect(url_for('letters_list'))
+        return see_other(url_for('letters_list'))
 # =============================================================================
 # Admin routes
 
@@ -3017,9 +3030,7 @@ def delete_letter_movement(movement_id):
 @admin_required
 def admin_users():
     """User management page"""
-    db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
     
     # Get all users with their roles and sections
     cursor.execute('''
@@ -3035,20 +3046,14 @@ def admin_users():
         ORDER BY u.user_id
     ''')
     
-    users = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    users = [dict(zip(columns, row)) for row in users]
+    users = [dict(row) for row in cursor.fetchall()]
     
     # Get all roles
     cursor.execute('SELECT * FROM user_roles ORDER BY role_id')
-    roles = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    roles = [dict(zip(columns, row)) for row in roles]
+    roles = [dict(row) for row in cursor.fetchall()]
     
     # Get all sections
-    sections = db.get_all_sections()
-    
-    db.close()
+    sections = get_sections()
     
     return render_template('admin/users.html', users=users, roles=roles, sections=sections)
 
@@ -3097,6 +3102,7 @@ def api_create_user():
             db.close()
             return jsonify({'success': False, 'error': 'Failed to create user'}), 500
         
+        
         # Assign roles
         roles = data.get('roles', [])
         for role_id in roles:
@@ -3242,22 +3248,22 @@ def edit_user(user_id):
         # Validation
         if not username or not full_name or not section_id:
             flash('Username, Full Name, and Section are required.', 'error')
-            return redirect(url_for('edit_user', user_id=user_id))
+            return see_other(url_for('edit_user', user_id=user_id))
         
         if not roles:
             flash('At least one role must be selected.', 'error')
-            return redirect(url_for('edit_user', user_id=user_id))
+            return see_other(url_for('edit_user', user_id=user_id))
         
         # Check if username already exists (for other users)
         cursor.execute('SELECT user_id FROM users WHERE username = ? AND user_id != ?', (username, user_id))
         if cursor.fetchone():
             flash(f'Username "{username}" is already taken.', 'error')
-            return redirect(url_for('edit_user', user_id=user_id))
+            return see_other(url_for('edit_user', user_id=user_id))
         
         # Prevent removing own superuser status
         if user_id == current_user.id and not is_superuser:
             flash('You cannot remove your own superuser status.', 'error')
-            return redirect(url_for('edit_user', user_id=user_id))
+            return see_other(url_for('edit_user', user_id=user_id))
         
         # Update user
         if new_password:
@@ -3311,7 +3317,7 @@ def edit_user(user_id):
         
         db.close()
         flash(f"User '{username}' updated successfully!", 'success')
-        return redirect(url_for('admin_users'))
+        return see_other(url_for('admin_users'))
     
     # GET - show form
     cursor.execute('''
@@ -3335,17 +3341,14 @@ def edit_user(user_id):
         flash('User not found.', 'error')
         return redirect(url_for('admin_users'))
     
-    columns = [desc[0] for desc in cursor.description]
-    user = dict(zip(columns, user))
+    user = dict(user)
     
     # Get all sections
-    sections = db.get_all_sections()
+    sections = get_sections()
     
     # Get all roles
     cursor.execute('SELECT * FROM user_roles ORDER BY role_id')
-    all_roles = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    all_roles = [dict(zip(columns, row)) for row in all_roles]
+    all_roles = [dict(row) for row in cursor.fetchall()]
     
     db.close()
     
@@ -3359,9 +3362,7 @@ def edit_user(user_id):
 @admin_required
 def admin_dashboard():
     """Admin monitoring dashboard - UPDATED WITH LETTERS"""
-    db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
     
     # System Statistics
     cursor.execute('SELECT COUNT(*) FROM users WHERE is_active = 1')
@@ -3406,9 +3407,7 @@ def admin_dashboard():
         ORDER BY al.created_at DESC
         LIMIT 50
     ''')
-    activities = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    activities = [dict(zip(columns, row)) for row in activities]
+    activities = [dict(row) for row in cursor.fetchall()]
     
     # Failed Login Attempts (if exists)
     try:
@@ -3443,9 +3442,7 @@ def admin_dashboard():
         ORDER BY activity_count DESC
         LIMIT 10
     ''')
-    top_users = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    top_users = [dict(zip(columns, row)) for row in top_users]
+    top_users = [dict(row) for row in cursor.fetchall()]
     
     # Document Processing Stats
     cursor.execute('''
@@ -3457,11 +3454,7 @@ def admin_dashboard():
         GROUP BY DATE(forwarded_date)
         ORDER BY date DESC
     ''')
-    ns_daily_activity = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    ns_daily_activity = [dict(zip(columns, row)) for row in ns_daily_activity]
-    
-    db.close()
+    ns_daily_activity = [dict(row) for row in cursor.fetchall()]
     
     stats = {
         'active_users': active_users,
@@ -3488,9 +3481,7 @@ def admin_dashboard():
 @admin_required
 def admin_logs():
     """View all activity logs with filtering"""
-    db = WBSEDCLDatabase()
-    conn = db.connect()
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
     
     # Get filter parameters
     activity_type = request.args.get('type', '')
@@ -3541,22 +3532,16 @@ def admin_logs():
     query += ' ORDER BY al.created_at DESC LIMIT 500'
     
     cursor.execute(query, params)
-    logs = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    logs = [dict(zip(columns, row)) for row in logs]
+    logs = [dict(row) for row in cursor.fetchall()]
     
     # Get all users for filter dropdown
     cursor.execute('SELECT user_id, username, full_name FROM users ORDER BY username')
-    users = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    users = [dict(zip(columns, row)) for row in users]
+    users = [dict(row) for row in cursor.fetchall()]
     
     # Get activity types
     cursor.execute('SELECT DISTINCT activity_type FROM activity_logs ORDER BY activity_type')
     activity_types = [row[0] for row in cursor.fetchall()]
     
-    db.close()
-    
     return render_template('admin/logs.html',
                          logs=logs,
                          users=users,
@@ -3804,17 +3789,14 @@ def export_logs():
         flash('User not found.', 'error')
         return redirect(url_for('admin_users'))
     
-    columns = [desc[0] for desc in cursor.description]
-    user = dict(zip(columns, user))
+    user = dict(user)
     
     # Get all sections
-    sections = db.get_all_sections()
+    sections = get_sections()
     
     # Get all roles
     cursor.execute('SELECT * FROM user_roles ORDER BY role_id')
-    all_roles = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    all_roles = [dict(zip(columns, row)) for row in all_roles]
+    all_roles = [dict(row) for row in cursor.fetchall()]
     
     db.close()
     
@@ -3871,7 +3853,7 @@ def edit_notesheet(notesheet_id):
         
         db.close()
         flash('Notesheet updated successfully!', 'success')
-        return redirect(url_for('notesheet_detail', notesheet_id=notesheet_id))
+        return see_other(url_for('notesheet_detail', notesheet_id=notesheet_id))
     
     # GET - show form
     cursor.execute('SELECT * FROM notesheets WHERE notesheet_id = ?', (notesheet_id,))
@@ -3882,8 +3864,7 @@ def edit_notesheet(notesheet_id):
         flash('Notesheet not found.', 'error')
         return redirect(url_for('notesheets_list'))
     
-    columns = [desc[0] for desc in cursor.description]
-    notesheet = dict(zip(columns, notesheet))
+    notesheet = dict(notesheet)
     
     db.close()
     return render_template('notesheets/edit.html', notesheet=notesheet)
@@ -3898,20 +3879,20 @@ def edit_notesheet_movement(movement_id):
     cursor = conn.cursor()
     
     if request.method == 'POST':
+        # Update and fetch the parent notesheet for the redirect in one statement
         cursor.execute('''
             UPDATE notesheet_movements SET
                 forwarded_date = ?,
                 comments = ?
             WHERE movement_id = ?
+            RETURNING notesheet_id
         ''', (
             request.form.get('forwarded_date'),
             request.form.get('comments'),
             movement_id
         ))
-        conn.commit()
-        
-        cursor.execute('SELECT notesheet_id FROM notesheet_movements WHERE movement_id = ?', (movement_id,))
         notesheet_id = cursor.fetchone()[0]
+        conn.commit()
         
         db.log_activity(current_user.id, 'movement_edited',
                        f"Edited notesheet movement ID {movement_id}",
@@ -3919,7 +3900,7 @@ def edit_notesheet_movement(movement_id):
         
         db.close()
         flash('Movement updated successfully!', 'success')
-        return redirect(url_for('notesheet_detail', notesheet_id=notesheet_id))
+        return see_other(url_for('notesheet_detail', notesheet_id=notesheet_id))
     
     # GET - show form
     cursor.execute('''
@@ -3935,8 +3916,7 @@ def edit_notesheet_movement(movement_id):
         flash('Movement not found.', 'error')
         return redirect(url_for('notesheets_list'))
     
-    columns = [desc[0] for desc in cursor.description]
-    movement = dict(zip(columns, movement))
+    movement = dict(movement)
     
     db.close()
     return render_template('notesheets/edit_movement.html', movement=movement)
@@ -3957,7 +3937,7 @@ def delete_notesheet_movement(movement_id):
     if not result:
         db.close()
         flash('Movement not found.', 'error')
-        return redirect(url_for('notesheets_list'))
+        return see_other(url_for('notesheets_list'))
     
     notesheet_id = result[0]
     
@@ -3971,7 +3951,7 @@ def delete_notesheet_movement(movement_id):
     
     db.close()
     flash('Movement deleted successfully!', 'success')
-    return redirect(url_for('notesheet_detail', notesheet_id=notesheet_id))
+    return see_other(url_for('notesheet_detail', notesheet_id=notesheet_id))
 
 # Bill Edit Routes
 @app.route('/bills/<int:bill_id>/edit', methods=['GET', 'POST'])
@@ -4039,7 +4019,7 @@ def edit_bill(bill_id):
         
         db.close()
         flash('Bill updated successfully!', 'success')
-        return redirect(url_for('bill_detail', bill_id=bill_id))
+        return see_other(url_for('bill_detail', bill_id=bill_id))
     
     # GET - show form
     cursor.execute('SELECT * FROM bills WHERE bill_id = ?', (bill_id,))
@@ -4050,8 +4030,7 @@ def edit_bill(bill_id):
         flash('Bill not found.', 'error')
         return redirect(url_for('bills_list'))
     
-    columns = [desc[0] for desc in cursor.description]
-    bill = dict(zip(columns, bill))
+    bill = dict(bill)
     
     db.close()
     return render_template('bills/edit.html', bill=bill)
@@ -4066,20 +4045,20 @@ def edit_bill_movement(movement_id):
     cursor = conn.cursor()
     
     if request.method == 'POST':
+        # Update and fetch the parent bill for the redirect in one statement
         cursor.execute('''
             UPDATE bill_movements SET
                 forwarded_date = ?,
                 comments = ?
             WHERE movement_id = ?
+            RETURNING bill_id
         ''', (
             request.form.get('forwarded_date'),
             request.form.get('comments'),
             movement_id
         ))
-        conn.commit()
-        
-        cursor.execute('SELECT bill_id FROM bill_movements WHERE movement_id = ?', (movement_id,))
         bill_id = cursor.fetchone()[0]
+        conn.commit()
         
         db.log_activity(current_user.id, 'movement_edited',
                        f"Edited bill movement ID {movement_id}",
@@ -4087,7 +4066,7 @@ def edit_bill_movement(movement_id):
         
         db.close()
         flash('Movement updated successfully!', 'success')
-        return redirect(url_for('bill_detail', bill_id=bill_id))
+        return see_other(url_for('bill_detail', bill_id=bill_id))
     
     # GET - show form
     cursor.execute('''
@@ -4103,8 +4082,7 @@ def edit_bill_movement(movement_id):
         flash('Movement not found.', 'error')
         return redirect(url_for('bills_list'))
     
-    columns = [desc[0] for desc in cursor.description]
-    movement = dict(zip(columns, movement))
+    movement = dict(movement)
     
     db.close()
     return render_template('bills/edit_movement.html', movement=movement)
@@ -4125,7 +4103,7 @@ def delete_bill_movement(movement_id):
     if not result:
         db.close()
         flash('Movement not found.', 'error')
-        return redirect(url_for('bills_list'))
+        return see_other(url_for('bills_list'))
     
     bill_id = result[0]
     
@@ -4139,7 +4117,7 @@ def delete_bill_movement(movement_id):
     
     db.close()
     flash('Movement deleted successfully!', 'success')
-    return redirect(url_for('bill_detail', bill_id=bill_id))
+    return see_other(url_for('bill_detail', bill_id=bill_id))
 
 
 # =============================================================================
@@ -4164,7 +4142,7 @@ def delete_notesheet(notesheet_id):
         if not result:
             flash('Notesheet not found.', 'error')
             db.close()
-            return redirect(url_for('notesheets_list'))
+            return see_other(url_for('notesheets_list'))
         
         notesheet_number = result[0]
         
@@ -4191,7 +4169,7 @@ def delete_notesheet(notesheet_id):
         flash(f'Error deleting notesheet: {str(e)}', 'error')
     
     db.close()
-    return redirect(url_for('notesheets_list'))
+    return see_other(url_for('notesheets_list'))
 
 # Delete Bill
 @app.route('/bills/<int:bill_id>/delete', methods=['POST'])
@@ -4211,7 +4189,7 @@ def delete_bill(bill_id):
         if not result:
             flash('Bill not found.', 'error')
             db.close()
-            return redirect(url_for('bills_list'))
+            return see_other(url_for('bills_list'))
         
         bill_number = result[0]
         
@@ -4238,7 +4216,7 @@ def delete_bill(bill_id):
         flash(f'Error deleting bill: {str(e)}', 'error')
     
     db.close()
-    return redirect(url_for('bills_list'))
+    return see_other(url_for('bills_list'))
 
 # Delete Letter
 @app.route('/letters/<int:letter_id>/delete', methods=['POST'])
@@ -4258,7 +4236,7 @@ def delete_letter(letter_id):
         if not result:
             flash('Letter not found.', 'error')
             db.close()
-            return redirect(url_for('letters_list'))
+            return see_other(url_for('letters_list'))
         
         letter_number = result[0]
         
@@ -4285,22 +4263,40 @@ def delete_letter(letter_id):
         flash(f'Error deleting letter: {str(e)}', 'error')
     
     db.close()
-    return redirect(url_for('letters_list'))
+    return see_other(url_for('letters_list'))
 
 
 
 
 # Error handlers
 
+# Error pages rendered for anonymous visitors, keyed by template name.
+# Bots probing missing URLs get the cached HTML instead of a fresh Jinja
+# render; logged-in users still get the page with their own navigation.
+# The cached copy holds a marker where the requested path goes, and each
+# request fills in its own path.
+_anonymous_error_pages = {}
+ERROR_PAGE_PATH_MARKER = '__REQUESTED_PATH__'
+
+def render_error_page(template_name):
+    """Render an error page, reusing the cached copy for anonymous visitors"""
+    if current_user.is_authenticated or session.get('_flashes'):
+        return render_template(template_name, requested_path=request.path)
+    
+    if template_name not in _anonymous_error_pages:
+        _anonymous_error_pages[template_name] = render_template(
+            template_name, requested_path=ERROR_PAGE_PATH_MARKER)
+    return _anonymous_error_pages[template_name].replace(ERROR_PAGE_PATH_MARKER, str(escape(request.path)))
+
 @app.errorhandler(404)
 def not_found_error(error):
     """Handle 404 errors"""
-    return render_template('errors/404.html'), 404
+    return render_error_page('errors/404.html'), 404
 
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
-    return render_template('errors/500.html'), 500
+    return render_error_page('errors/500.html'), 500
 
 @app.route('/service-worker.js')
 def service_worker():
@@ -4330,8 +4326,5 @@ if __name__ == '__main__':
     print("Access the application at: http://127.0.0.1:5000")
     print("Default login: admin / admin123")
     print("=" * 60)
-    app.run(debug=True, host='0.0.0.0', port=5000)
-    print("Access the application at: http://127.0.0.1:5000")
-    print("Default login: admin / admin123")
-    print("=" * 60)
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Development server only - production runs under gunicorn/waitress via wsgi.py
+    app.run(debug=DEV_MODE, host='0.0.0.0', port=5000, threaded=True)
@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration for WBSEDCL Tracking System
+Usage: gunicorn -c gunicorn.conf.py wsgi:application
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Several worker processes, each with a few threads, so requests waiting
+# on SQLite I/O don't block one another
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+
+# Import the app once in the master and fork workers from it
+preload_app = True
+
+timeout = 60
+accesslog = '-'
+errorlog = '-'
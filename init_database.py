@@ -1,9 +1,98 @@
 import sqlite3
 import hashlib
+import threading
+import atexit
+import time
 from datetime import datetime
 import os
 
 
+# ----------------------------------------------------------------------
+# Connection pool: one long-lived connection per thread and database file,
+# reused across requests instead of reconnecting for every query
+# ----------------------------------------------------------------------
+_thread_local = threading.local()
+_all_connections = []
+_all_connections_lock = threading.Lock()
+
+# Applied once when a pooled connection is opened: WAL lets readers run
+# alongside a writer, and NORMAL sync is durable enough under WAL.
+# analysis_limit keeps ANALYZE / PRAGMA optimize to a sample of each index.
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-65536',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA foreign_keys=ON',
+    'PRAGMA analysis_limit=400',
+)
+
+# Pooled connections live as long as the server process, so between requests
+# each one runs PRAGMA optimize this often (seconds) to keep statistics fresh
+OPTIMIZE_INTERVAL = 3600
+
+
+def get_connection(db_path):
+    """Return this thread's connection to db_path, opening it on first use"""
+    conns = getattr(_thread_local, 'conns', None)
+    if conns is None:
+        conns = _thread_local.conns = {}
+
+    conn = conns.get(db_path)
+    if conn is None:
+        # Only this thread uses the connection; check_same_thread is relaxed
+        # so close_all_connections() can shut it down at interpreter exit
+        conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        conns[db_path] = conn
+        _optimized_at()[db_path] = time.monotonic()
+        with _all_connections_lock:
+            _all_connections.append(conn)
+    return conn
+
+
+def _optimized_at():
+    """When each of this thread's connections last ran PRAGMA optimize"""
+    optimized_at = getattr(_thread_local, 'optimized_at', None)
+    if optimized_at is None:
+        optimized_at = _thread_local.optimized_at = {}
+    return optimized_at
+
+
+def release_connections():
+    """Roll back anything left uncommitted on this thread's connections, and
+    run PRAGMA optimize on those that have not for OPTIMIZE_INTERVAL"""
+    now = time.monotonic()
+    optimized_at = _optimized_at()
+    for db_path, conn in getattr(_thread_local, 'conns', {}).items():
+        if conn.in_transaction:
+            conn.rollback()
+        if now - optimized_at.get(db_path, now) >= OPTIMIZE_INTERVAL:
+            try:
+                conn.execute('PRAGMA optimize')
+                optimized_at[db_path] = now
+            except sqlite3.OperationalError:
+                pass  # database busy - try again after the next request
+
+
+@atexit.register
+def close_all_connections():
+    """Let SQLite refresh planner statistics, then close every pooled connection"""
+    with _all_connections_lock:
+        for conn in _all_connections:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+                conn.execute('PRAGMA optimize')
+                conn.close()
+            except sqlite3.Error:
+                pass
+        _all_connections.clear()
+
+
 class WBSEDCLDatabase:
     """Database handler for WBSEDCL Tracking System with Section Support"""
 
@@ -15,15 +104,26 @@ class WBSEDCLDatabase:
     # Connection helpers
     # ------------------------------------------------------------------
     def connect(self):
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.row_factory = sqlite3.Row
+        self.conn = get_connection(self.db_path)
         return self.conn
 
     def close(self):
+        # The pooled connection stays open; only discard uncommitted work,
+        # as closing a private connection used to
         if self.conn:
-            self.conn.close()
+            if self.conn.in_transaction:
+                self.conn.rollback()
             self.conn = None
 
+    def analyze(self):
+        """Rebuild the query planner statistics (run after bulk imports)"""
+        conn = self.connect()
+        try:
+            conn.execute('ANALYZE')
+            conn.commit()
+        finally:
+            self.close()
+    
     # ------------------------------------------------------------------
     # Initialization
     # ------------------------------------------------------------------
@@ -39,6 +139,8 @@ class WBSEDCLDatabase:
             with open(schema_file, 'r') as f:
                 cursor.executescript(f.read())
             conn.commit()
+            cursor.execute('ANALYZE')
+            conn.commit()
             print(f"Database initialized successfully at {self.db_path}")
             return True
         except Exception as e:
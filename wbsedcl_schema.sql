@@ -442,18 +442,40 @@ CREATE INDEX IF NOT EXISTS idx_notesheets_status ON notesheets(current_status);
 CREATE INDEX IF NOT EXISTS idx_notesheets_holder ON notesheets(current_holder);
 CREATE INDEX IF NOT EXISTS idx_notesheets_section ON notesheets(current_section_id);
 CREATE INDEX IF NOT EXISTS idx_notesheets_parked ON notesheets(is_parked);
+CREATE INDEX IF NOT EXISTS ix_ns_holder_date ON notesheets(current_holder, received_date DESC);
+CREATE INDEX IF NOT EXISTS ix_ns_holder_status ON notesheets(current_holder, current_status, is_parked);
+CREATE INDEX IF NOT EXISTS ix_ns_parked ON notesheets(is_parked) WHERE is_parked = 1;
+CREATE INDEX IF NOT EXISTS ix_ns_active ON notesheets(received_date) WHERE is_parked = 0 AND current_holder IS NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_ns_priority ON notesheets(priority, is_parked, current_status, received_date);
+CREATE INDEX IF NOT EXISTS ix_ns_status_date ON notesheets(current_status, received_date DESC);
+CREATE INDEX IF NOT EXISTS ix_ns_received ON notesheets(received_date DESC);
+CREATE INDEX IF NOT EXISTS ix_ns_parked_cover ON notesheets(parked_date DESC, notesheet_id, notesheet_number, subject, sender_name, received_date, parked_by, is_parked) WHERE is_parked = 1;
+CREATE INDEX IF NOT EXISTS ix_ns_subject ON notesheets(subject COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ix_ns_sender ON notesheets(sender_name COLLATE NOCASE);
 CREATE INDEX IF NOT EXISTS idx_notesheet_movements_notesheet ON notesheet_movements(notesheet_id);
 CREATE INDEX IF NOT EXISTS idx_notesheet_movements_current ON notesheet_movements(is_current);
+CREATE INDEX IF NOT EXISTS ix_nsm_current ON notesheet_movements(notesheet_id, is_current, forwarded_date);
 
 CREATE INDEX IF NOT EXISTS idx_bills_number ON bills(bill_number);
 CREATE INDEX IF NOT EXISTS idx_bills_status ON bills(current_status);
 CREATE INDEX IF NOT EXISTS idx_bills_holder ON bills(current_holder);
 CREATE INDEX IF NOT EXISTS idx_bills_section ON bills(current_section_id);
 CREATE INDEX IF NOT EXISTS idx_bills_parked ON bills(is_parked);
+CREATE INDEX IF NOT EXISTS ix_bills_holder_date ON bills(current_holder, received_date DESC);
+CREATE INDEX IF NOT EXISTS ix_bills_holder_payment ON bills(current_holder, payment_status);
+CREATE INDEX IF NOT EXISTS ix_bills_parked ON bills(is_parked) WHERE is_parked = 1;
+CREATE INDEX IF NOT EXISTS ix_bills_active ON bills(received_date) WHERE is_parked = 0 AND current_holder IS NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_bills_priority ON bills(priority, is_parked, payment_status, received_date);
+CREATE INDEX IF NOT EXISTS ix_bills_status_date ON bills(current_status, received_date DESC);
+CREATE INDEX IF NOT EXISTS ix_bills_received ON bills(received_date DESC);
+CREATE INDEX IF NOT EXISTS ix_bills_vendor ON bills(vendor_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ix_bills_invoice ON bills(invoice_number COLLATE NOCASE);
 CREATE INDEX IF NOT EXISTS idx_bill_movements_bill ON bill_movements(bill_id);
 CREATE INDEX IF NOT EXISTS idx_bill_movements_current ON bill_movements(is_current);
+CREATE INDEX IF NOT EXISTS ix_bm_current ON bill_movements(bill_id, is_current, forwarded_date);
 
 CREATE INDEX IF NOT EXISTS idx_users_username ON users(username);
 CREATE INDEX IF NOT EXISTS idx_users_section ON users(section_id);
+CREATE INDEX IF NOT EXISTS ix_urm_role ON user_role_mapping(role_id, user_id);
 CREATE INDEX IF NOT EXISTS idx_activity_logs_user ON activity_logs(user_id);
 CREATE INDEX IF NOT EXISTS idx_activity_logs_date ON activity_logs(created_at);
\ No newline at end of file
@@ -0,0 +1,9 @@
+"""
+WSGI entry point for production servers
+Usage (Linux):   gunicorn -c gunicorn.conf.py wsgi:application
+Usage (Windows): waitress-serve --port=8000 --threads=8 wsgi:application
+"""
+
+from app import app
+
+application = app